@@ -1,14 +1,34 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from os import environ
 from typing import Dict, List, Optional
 from urllib.parse import urlsplit
 
 from fastapi import FastAPI, Request, Response
 
+from . import services
 from .database import close_mongo_connection, connect_to_mongo
 from .routes import auth, games, scans
 
 app = FastAPI(title="Sentient Tracker API")
 
+
+def _configure_app_logging() -> QueueListener:
+    # Records are handed to a background thread so async handlers never block on stream writes.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+
+    app_logger = logging.getLogger(__package__)
+    app_logger.setLevel(logging.INFO)
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.propagate = False
+    return QueueListener(log_queue, stream_handler)
+
+
+log_listener = _configure_app_logging()
+
 ALLOWED_METHODS = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
 ALLOWED_HEADERS = "Content-Type, Authorization"
 
@@ -96,9 +116,12 @@ async def health():
     return {"status": "ok"}
 
 
-# event handlers for DB
+# event handlers for logging, DB and the shared outbound HTTP client
+app.add_event_handler("startup", log_listener.start)
 app.add_event_handler("startup", connect_to_mongo)
 app.add_event_handler("shutdown", close_mongo_connection)
+app.add_event_handler("shutdown", services.close_http_client)
+app.add_event_handler("shutdown", log_listener.stop)
 
 # include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
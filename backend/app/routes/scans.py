@@ -134,7 +134,7 @@ async def run_scan(id: str, request: Request, user=Depends(get_current_user)):
     subreddit = game.get("subreddit", "")
 
     try:
-        posts = await services.fetch_reddit_posts(subreddit, limit=100)
+        posts, posts_stale = await services.fetch_reddit_posts_with_staleness(subreddit, limit=100)
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"Failed to fetch Reddit posts: {exc}")
 
@@ -173,10 +173,12 @@ async def run_scan(id: str, request: Request, user=Depends(get_current_user)):
         "posts": posts,
         "comments": comments,
         "analysis": analysis,
+        # Set when Arctic Shift was unavailable and expired cached posts were analysed instead.
+        "meta": {"stale_posts": posts_stale},
     }
 
     await database.db.scan_results.insert_one(result)
-    return {"message": "scan complete", "result_id": result["_id"]}
+    return {"message": "scan complete", "result_id": result["_id"], "stale_posts": posts_stale}
 
 
 @router.get("/{id}/results", response_model=List[ScanResultOut])
@@ -1,60 +1,76 @@
+import heapq
+import logging
 import math
 import os
 import re
 import time
-from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from operator import itemgetter
+from typing import Any, DefaultDict, Dict, List, Optional, Tuple
 
 from .services_common import (
     MAX_COMMENTS_PER_POST,
     MAX_POSTS_FINAL,
     POST_SELFTEXT_TRUNCATE,
     TOP_POSTS_FOR_COMMENTS,
+    _REDDIT_LINK_RE,
+    _TOKEN_RE,
     _calculate_post_rank,
     _extract_json_payload,
+    _extract_partial_json_payload,
     _format_permalink,
     _normalize_subreddit,
+    _openai_chat_completion,
+    _openai_chat_completion_with_finish_reason,
 )
 
+logger = logging.getLogger(__name__)
+
+_POST_ID_RE = re.compile(r"[a-z0-9_]{5,}", re.IGNORECASE)
+_POST_TAG_RE = re.compile(r"\[POST:([A-Za-z0-9_]+)\]")
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_SUMMARY_WORD_RE = re.compile(r"[A-Za-z0-9']+")
+
+_INSUFFICIENT_PAIN_TEXT = "Insufficient data to identify repeated pain points."
+_INSUFFICIENT_WIN_TEXT = "Insufficient data to identify repeated wins."
+
+def _format_post_summary(post: Dict[str, Any]) -> str:
+    # Posts arrive pre-typed from _map_post, so fields are read without re-coercion.
+    line = f"[POST:{post['id']}] [{post['score']} pts, {post['num_comments']} comments] {post['title']}"
+    selftext = post["selftext"][:POST_SELFTEXT_TRUNCATE]
+    if selftext and selftext not in ("[removed]", "[deleted]"):
+        content = selftext.replace("\n", " ").strip()
+        return f"{line}\n  Content: {content}"
+    return line
+
+
 def _build_analysis_prompt(
     posts: List[Dict[str, Any]],
     comments: List[Dict[str, Any]],
     game_name: str,
     keywords: str,
 ) -> str:
-    post_summaries: List[str] = []
-    for post in posts[:MAX_POSTS_FINAL]:
-        post_id = str(post.get("id") or "")
-        title = str(post.get("title", "") or "")
-        score = int(post.get("score", 0) or 0)
-        num_comments = int(post.get("num_comments", 0) or 0)
-        selftext = str(post.get("selftext", "") or "")[:POST_SELFTEXT_TRUNCATE]
-
-        line = f"[POST:{post_id}] [{score} pts, {num_comments} comments] {title}"
-        if selftext and selftext not in ("[removed]", "[deleted]"):
-            line += f"\n  Content: {selftext.replace(chr(10), ' ').strip()}"
-
-        post_summaries.append(line)
+    post_summaries = [_format_post_summary(post) for post in posts[:MAX_POSTS_FINAL]]
 
     comments_text = ""
     if comments:
         comment_lines: List[str] = ["COMMENT SAMPLES FROM TOP POSTS:"]
         for comment in comments[: TOP_POSTS_FOR_COMMENTS * MAX_COMMENTS_PER_POST]:
-            source_post = str(comment.get("source_post_id") or "")
-            body = str(comment.get("body", "") or "")
-            score = int(comment.get("score", 0) or 0)
-            comment_lines.append(f"- [POST:{source_post}] [{score} pts] {body}")
+            comment_lines.append(
+                f"- [POST:{comment['source_post_id']}] [{comment['score']} pts] {comment['body']}"
+            )
         comments_text = "\n".join(comment_lines)
 
     subreddit_name = "Unknown"
     for post in posts:
-        value = str(post.get("subreddit", "") or "").strip()
+        value = post["subreddit"].strip()
         if value:
             subreddit_name = value if value.lower().startswith("r/") else f"r/{value}"
             break
 
     now_ts = time.time()
     recent_cutoff = now_ts - (3 * 24 * 60 * 60)
-    recent_posts = sum(1 for p in posts if float(p.get("created_utc", 0) or 0) >= recent_cutoff)
+    recent_posts = sum(1 for p in posts if p["created_utc"] >= recent_cutoff)
     older_posts = max(0, len(posts) - recent_posts)
 
     keyword_note = f"\nKeywords to watch for: {keywords}" if keywords else ""
@@ -116,7 +132,7 @@ Respond with valid JSON only, no markdown fences.
 
 
 def _normalize_sentiment_label(value: Any) -> str:
-    raw = str(value or "").strip().lower()
+    raw = (value if type(value) is str else str(value or "")).strip().lower()
     if "positive" in raw:
         return "Positive"
     if "negative" in raw:
@@ -127,31 +143,57 @@ def _normalize_sentiment_label(value: Any) -> str:
 
 
 def _normalize_evidence_links(value: Any) -> List[str]:
-    raw_values: List[str] = []
+    raw_values: List[Any] = []
     if isinstance(value, list):
-        raw_values = [str(v).strip() for v in value if str(v).strip()]
+        raw_values = value
     elif isinstance(value, str):
-        raw_values = [value.strip()] if value.strip() else []
+        raw_values = [value]
 
-    normalized: List[str] = []
+    # Insertion-ordered set; only the first two distinct links are kept, so stop once we have them.
+    # Each value is stripped once, lazily, so entries past the second link are never touched.
+    normalized: Dict[str, None] = {}
     for raw in raw_values:
-        candidate = str(raw or "").strip()
+        candidate = (raw if type(raw) is str else str(raw)).strip()
         if not candidate:
             continue
 
-        match = re.search(r"reddit\.com/comments/([a-z0-9_]+)", candidate, re.IGNORECASE)
+        match = _REDDIT_LINK_RE.search(candidate)
         if match:
-            canonical = _format_permalink(match.group(1))
-            if canonical not in normalized:
-                normalized.append(canonical)
-            continue
+            normalized[_format_permalink(match.group(1))] = None
+        elif _POST_ID_RE.fullmatch(candidate):
+            normalized[_format_permalink(candidate)] = None
+
+        if len(normalized) >= 2:
+            break
+
+    return list(normalized)
+
+
+_INSIGHT_TEXT_KEYS = ("text", "summary", "point", "title")
+
+
+def _insight_item_text(raw_item: Dict[str, Any]) -> str:
+    # Models use several field names for an item's text; the first truthy one wins.
+    for key in _INSIGHT_TEXT_KEYS:
+        value = raw_item.get(key)
+        if value:
+            return (value if type(value) is str else str(value)).strip()
+    return ""
 
-        if re.fullmatch(r"[a-z0-9_]{5,}", candidate, re.IGNORECASE):
-            canonical = _format_permalink(candidate)
-            if canonical not in normalized:
-                normalized.append(canonical)
 
-    return normalized[:2]
+_INSIGHT_POST_ID_KEYS = ("post_id", "source_post_id", "id")
+
+
+def _insight_item_post_ids(raw_item: Dict[str, Any]) -> Dict[str, None]:
+    # Most items carry no id fields, so missing keys are skipped before any string work.
+    post_ids: Dict[str, None] = {}
+    for key in _INSIGHT_POST_ID_KEYS:
+        value = raw_item.get(key)
+        if value:
+            raw_id = (value if type(value) is str else str(value)).strip()
+            if raw_id:
+                post_ids[raw_id] = None
+    return post_ids
 
 
 def _normalize_insight_items(value: Any) -> List[Dict[str, Any]]:
@@ -162,39 +204,22 @@ def _normalize_insight_items(value: Any) -> List[Dict[str, Any]]:
     for raw_item in value:
         text_value = ""
         evidence: List[str] = []
-        candidate_post_ids: List[str] = []
+        candidate_post_ids: Dict[str, None] = {}
 
         if isinstance(raw_item, str):
             text_value = raw_item.strip()
         elif isinstance(raw_item, dict):
-            text_value = str(
-                raw_item.get("text")
-                or raw_item.get("summary")
-                or raw_item.get("point")
-                or raw_item.get("title")
-                or ""
-            ).strip()
+            text_value = _insight_item_text(raw_item)
             evidence = _normalize_evidence_links(raw_item.get("evidence"))
-
-            for key in ("post_id", "source_post_id", "id"):
-                raw_id = str(raw_item.get(key) or "").strip()
-                if raw_id and raw_id not in candidate_post_ids:
-                    candidate_post_ids.append(raw_id)
+            candidate_post_ids = _insight_item_post_ids(raw_item)
 
         if not text_value:
             continue
 
-        for post_id in _extract_post_ids(text_value):
-            if post_id not in candidate_post_ids:
-                candidate_post_ids.append(post_id)
+        candidate_post_ids.update(dict.fromkeys(_extract_post_ids(text_value)))
 
         if not evidence and candidate_post_ids:
-            for post_id in candidate_post_ids:
-                link = _format_permalink(post_id)
-                if link not in evidence:
-                    evidence.append(link)
-                if len(evidence) >= 2:
-                    break
+            evidence = [_format_permalink(post_id) for post_id in list(candidate_post_ids)[:2]]
 
         items.append({"text": text_value, "evidence": evidence[:2]})
 
@@ -205,15 +230,15 @@ def _normalize_themes(value: Any) -> List[str]:
     if not isinstance(value, list):
         return []
 
-    themes: List[str] = []
+    themes: Dict[str, None] = {}
     for item in value:
-        text = str(item).strip()
-        if text and text not in themes:
-            themes.append(text)
+        text = (item if type(item) is str else str(item)).strip()
+        if text:
+            themes[text] = None
         if len(themes) >= 10:
             break
 
-    return themes
+    return list(themes)
 
 
 def _normalize_analysis(result: Dict[str, Any]) -> Dict[str, Any]:
@@ -226,19 +251,22 @@ def _normalize_analysis(result: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 def _summary_word_count(text: str) -> int:
-    return len(re.findall(r"[A-Za-z0-9']+", str(text or "")))
+    return len(_SUMMARY_WORD_RE.findall(str(text or "")))
 
 def _summary_post_ref_count(text: str) -> int:
     post_ids = _extract_post_ids(str(text or ""))
     return len(set(post_ids))
 
+def _summary_has_depth(summary: str) -> bool:
+    return _summary_word_count(summary) >= 65 and _summary_post_ref_count(summary) >= 2
+
+
 def _ensure_detailed_sentiment_summary(primary_summary: str, fallback_summary: str) -> str:
     primary = str(primary_summary or "").strip()
     fallback = str(fallback_summary or "").strip()
     if not primary:
         return fallback
-    has_depth = _summary_word_count(primary) >= 65 and _summary_post_ref_count(primary) >= 2
-    if has_depth:
+    if _summary_has_depth(primary):
         return primary
     if fallback and fallback not in primary:
         if _summary_word_count(primary) < 55 or _summary_post_ref_count(primary) < 2:
@@ -250,8 +278,8 @@ def _post_signal_blob(post: Dict[str, Any]) -> str:
 
 
 def _post_engagement_weight(post: Dict[str, Any]) -> float:
-    score = max(0, int(post.get("score", 0) or 0))
-    comments = max(0, int(post.get("num_comments", 0) or 0))
+    score = max(0, post["score"])
+    comments = max(0, post["num_comments"])
     return 1.0 + math.log(score + 1) + 1.2 * math.log(comments + 1)
 
 
@@ -268,70 +296,101 @@ POSITIVE_SIGNAL_TERMS = {
 }
 
 
-THEME_STOP_WORDS = {
+# Single words only: tokens are filtered against this before n-grams are formed.
+THEME_STOP_WORDS = frozenset({
     "the", "and", "with", "from", "this", "that", "have", "your", "about", "into", "they", "their",
     "them", "what", "when", "where", "which", "were", "been", "just", "also", "more", "some", "many",
     "over", "than", "there", "users", "community", "game", "reddit", "post", "like", "would", "most",
     "much", "could", "should", "really", "still", "very", "make", "makes", "made", "stand",
-}
+})
 
 
-def _has_negative_signal(text_blob: str) -> bool:
-    return any(term in text_blob for term in NEGATIVE_SIGNAL_TERMS)
+_NEGATIVE_SIGNAL_RE = re.compile("|".join(map(re.escape, sorted(NEGATIVE_SIGNAL_TERMS))))
 
 
-def _has_positive_signal(text_blob: str) -> bool:
-    return any(term in text_blob for term in POSITIVE_SIGNAL_TERMS)
+_POSITIVE_SIGNAL_RE = re.compile("|".join(map(re.escape, sorted(POSITIVE_SIGNAL_TERMS))))
 
 
-def _extract_theme_phrases_from_titles(posts: List[Dict[str, Any]], max_phrases: int = 6) -> List[str]:
-    scored_phrases: Dict[str, float] = {}
+def _classify_signals(text_blob: str) -> Tuple[bool, bool]:
+    # One alternation scan per polarity keeps plain substring semantics without a Python-level term loop.
+    return (
+        _POSITIVE_SIGNAL_RE.search(text_blob) is not None,
+        _NEGATIVE_SIGNAL_RE.search(text_blob) is not None,
+    )
+
 
+def _annotate_posts(posts: List[Dict[str, Any]]) -> List[Tuple[float, bool, bool]]:
+    # Parallel (weight, positive, negative) rows; posts are persisted as-is, so nothing is stashed on them.
+    annotations: List[Tuple[float, bool, bool]] = []
     for post in posts:
-        title = str(post.get("title", "") or "").lower()
+        is_positive, is_negative = _classify_signals(_post_signal_blob(post))
+        annotations.append((_post_engagement_weight(post), is_positive, is_negative))
+    return annotations
+
+
+def _weighted_sentiment_label(annotations: List[Tuple[float, bool, bool]]) -> str:
+    positive_weight = 0.0
+    negative_weight = 0.0
+    for weight, is_positive, is_negative in annotations:
+        if is_positive:
+            positive_weight += weight
+        if is_negative:
+            negative_weight += weight
+
+    if negative_weight > positive_weight * 1.15:
+        return "Negative"
+    if positive_weight > negative_weight * 1.15:
+        return "Positive"
+    return "Mixed"
+
+
+def _extract_theme_phrases_from_titles(
+    posts: List[Dict[str, Any]],
+    max_phrases: int = 6,
+    weights: Optional[List[float]] = None,
+) -> List[str]:
+    # Tuple keys defer the " ".join to the handful of phrases that are actually returned.
+    scored_phrases: DefaultDict[Tuple[str, ...], float] = defaultdict(float)
+
+    for post_idx, post in enumerate(posts):
+        title = post["title"].lower()
         tokens = [
             token
-            for token in re.findall(r"[a-z0-9]+", title)
+            for token in _TOKEN_RE.findall(title)
             if len(token) > 2 and token not in THEME_STOP_WORDS
         ]
         if len(tokens) < 2:
             continue
 
-        weight = _post_engagement_weight(post)
-        for n in (3, 2):
-            if len(tokens) < n:
-                continue
-            for idx in range(len(tokens) - n + 1):
-                phrase = " ".join(tokens[idx : idx + n])
-                if phrase in THEME_STOP_WORDS:
-                    continue
-                scored_phrases[phrase] = scored_phrases.get(phrase, 0.0) + weight
+        weight = weights[post_idx] if weights is not None else _post_engagement_weight(post)
+        # Trigrams are inserted before bigrams so they win ties in the ranking below.
+        for trigram in zip(tokens, tokens[1:], tokens[2:]):
+            scored_phrases[trigram] += weight
+        for bigram in zip(tokens, tokens[1:]):
+            scored_phrases[bigram] += weight
 
-    ranked = sorted(scored_phrases.items(), key=lambda item: item[1], reverse=True)
-    phrases = [phrase for phrase, _ in ranked[: max(max_phrases, 1)]]
+    ranked = heapq.nlargest(max(max_phrases, 1), scored_phrases.items(), key=itemgetter(1))
+    phrases = [" ".join(phrase) for phrase, _ in ranked]
 
     if phrases:
         return phrases
 
-    fallback_phrases: List[str] = []
+    fallback_phrases: Dict[str, None] = {}
     for post in posts:
-        title = str(post.get("title", "") or "").strip()
+        title = post["title"].strip()
         if not title:
             continue
-        words = [w for w in re.findall(r"[A-Za-z0-9]+", title) if len(w) > 2]
+        words = [w for w in _WORD_RE.findall(title) if len(w) > 2]
         if len(words) >= 2:
-            phrase = " ".join(words[: min(4, len(words))]).lower()
-            if phrase not in fallback_phrases:
-                fallback_phrases.append(phrase)
+            fallback_phrases[" ".join(words[: min(4, len(words))]).lower()] = None
         if len(fallback_phrases) >= max_phrases:
             break
 
-    return fallback_phrases
+    return list(fallback_phrases)
 
 
 def _build_schema_fallback(posts: List[Dict[str, Any]], game_name: str = "") -> Dict[str, Any]:
-    ranked_posts = sorted(posts or [], key=_calculate_post_rank, reverse=True)
-    top_posts = ranked_posts[:15]
+    top_posts = heapq.nlargest(15, posts or [], key=_calculate_post_rank)
 
     if not top_posts:
         return {
@@ -341,30 +400,17 @@ def _build_schema_fallback(posts: List[Dict[str, Any]], game_name: str = "") ->
                 "Limited data - not enough high-signal posts to determine concrete product themes",
             ],
             "pain_points": [
-                {"text": "Insufficient data to identify repeated pain points.", "evidence": []}
+                {"text": _INSUFFICIENT_PAIN_TEXT, "evidence": []}
             ],
             "wins": [
-                {"text": "Insufficient data to identify repeated wins.", "evidence": []}
+                {"text": _INSUFFICIENT_WIN_TEXT, "evidence": []}
             ],
         }
 
-    positive_weight = 0.0
-    negative_weight = 0.0
-    for post in top_posts:
-        blob = _post_signal_blob(post)
-        weight = _post_engagement_weight(post)
-        if _has_positive_signal(blob):
-            positive_weight += weight
-        if _has_negative_signal(blob):
-            negative_weight += weight
-
-    if negative_weight > positive_weight * 1.15:
-        sentiment_label = "Negative"
-    elif positive_weight > negative_weight * 1.15:
-        sentiment_label = "Positive"
-    else:
-        sentiment_label = "Mixed"
-    refs = [str(post.get("id") or "").strip() for post in top_posts if str(post.get("id") or "").strip()]
+    # Weights and signal flags feed the sentiment tally, theme scoring and pain/win picks.
+    annotations = _annotate_posts(top_posts)
+    sentiment_label = _weighted_sentiment_label(annotations)
+    refs = [post_id for post_id in (post["id"].strip() for post in top_posts) if post_id]
     ref_one = refs[0] if refs else ""
     ref_two = refs[1] if len(refs) > 1 else ref_one
     ref_three = refs[2] if len(refs) > 2 else ref_two
@@ -383,7 +429,7 @@ def _build_schema_fallback(posts: List[Dict[str, Any]], game_name: str = "") ->
         f"From a product perspective, priority should go to the most repeated friction patterns first, while protecting the features players consistently praise for retention and satisfaction. "
         f"The strongest diagnostic references are concentrated around {primary_ref_label} and {secondary_ref_label}, with additional corroboration in {tertiary_ref_label}."
     ).strip()
-    phrases = _extract_theme_phrases_from_titles(top_posts, max_phrases=6)
+    phrases = _extract_theme_phrases_from_titles(top_posts, max_phrases=6, weights=[weight for weight, _, _ in annotations])
     if not phrases:
         phrases = ["gameplay feedback patterns", "content pacing concerns", "progression and balance issues"]
 
@@ -395,8 +441,8 @@ def _build_schema_fallback(posts: List[Dict[str, Any]], game_name: str = "") ->
             f"{phrase.title()} - repeated player discussion with concrete product implications{suffix}"
         )
 
-    negative_posts = [post for post in top_posts if _has_negative_signal(_post_signal_blob(post))]
-    positive_posts = [post for post in top_posts if _has_positive_signal(_post_signal_blob(post))]
+    negative_posts = [post for post, (_, _, is_negative) in zip(top_posts, annotations) if is_negative]
+    positive_posts = [post for post, (_, is_positive, _) in zip(top_posts, annotations) if is_positive]
     if not negative_posts:
         negative_posts = top_posts[-5:] if len(top_posts) >= 5 else top_posts
     if not positive_posts:
@@ -409,8 +455,8 @@ def _build_schema_fallback(posts: List[Dict[str, Any]], game_name: str = "") ->
         pain_post = negative_posts[idx % len(negative_posts)]
         win_post = positive_posts[idx % len(positive_posts)]
 
-        pain_title = str(pain_post.get("title", "") or "Player-reported product issue").strip()
-        pain_id = str(pain_post.get("id", "") or "").strip()
+        pain_title = (pain_post["title"] or "Player-reported product issue").strip()
+        pain_id = pain_post["id"].strip()
         pain_points.append(
             {
                 "text": f"Players report friction around: {pain_title[:170]}",
@@ -418,8 +464,8 @@ def _build_schema_fallback(posts: List[Dict[str, Any]], game_name: str = "") ->
             }
         )
 
-        win_title = str(win_post.get("title", "") or "Player-reported product strength").strip()
-        win_id = str(win_post.get("id", "") or "").strip()
+        win_title = (win_post["title"] or "Player-reported product strength").strip()
+        win_id = win_post["id"].strip()
         wins.append(
             {
                 "text": f"Players highlight a positive signal in: {win_title[:170]}",
@@ -440,11 +486,9 @@ def _ensure_evidence_for_items(items: List[Dict[str, Any]], fallback_posts: List
     if not items:
         return []
 
-    fallback_links = [
-        _format_permalink(str(post.get("id") or "").strip())
-        for post in sorted(fallback_posts or [], key=_calculate_post_rank, reverse=True)
-        if str(post.get("id") or "").strip()
-    ]
+    # Ranked fallback links are only needed when an item has no evidence of its own. Item idx picks
+    # link idx, so the top len(items) posts are enough.
+    fallback_links: Optional[List[str]] = None
 
     ensured: List[Dict[str, Any]] = []
     for idx, item in enumerate(items):
@@ -452,16 +496,18 @@ def _ensure_evidence_for_items(items: List[Dict[str, Any]], fallback_posts: List
         evidence = _normalize_evidence_links(item.get("evidence"))
 
         if not evidence:
-            for post_id in _extract_post_ids(text_value):
-                link = _format_permalink(post_id)
-                if link not in evidence:
-                    evidence.append(link)
-                if len(evidence) >= 2:
-                    break
+            post_ids = list(dict.fromkeys(_extract_post_ids(text_value)))[:2]
+            evidence = [_format_permalink(post_id) for post_id in post_ids]
 
-        if not evidence and fallback_links:
-            fallback_link = fallback_links[idx % len(fallback_links)]
-            evidence.append(fallback_link)
+        if not evidence:
+            if fallback_links is None:
+                linkable_posts = [post for post in fallback_posts or [] if post["id"].strip()]
+                fallback_links = [
+                    _format_permalink(post["id"].strip())
+                    for post in heapq.nlargest(len(items), linkable_posts, key=_calculate_post_rank)
+                ]
+            if fallback_links:
+                evidence.append(fallback_links[idx % len(fallback_links)])
 
         ensured.append({"text": text_value, "evidence": evidence[:2]})
 
@@ -474,29 +520,38 @@ def ensure_valid_analysis_schema(
     game_name: str = "",
 ) -> Dict[str, Any]:
     normalized = _normalize_analysis(result if isinstance(result, dict) else {})
-    fallback = _build_schema_fallback(fallback_posts, game_name=game_name)
+
+    # The deterministic fallback is only built if some field actually needs it, and at most once.
+    fallback_cache: Dict[str, Any] = {}
+
+    def _fallback() -> Dict[str, Any]:
+        if not fallback_cache:
+            fallback_cache.update(_build_schema_fallback(fallback_posts, game_name=game_name))
+        return fallback_cache
 
     sentiment_label = normalized.get("sentiment_label")
     if sentiment_label not in ("Positive", "Mixed", "Negative"):
-        sentiment_label = fallback.get("sentiment_label", "Mixed")
+        sentiment_label = _fallback().get("sentiment_label", "Mixed")
 
-    sentiment_summary = _ensure_detailed_sentiment_summary(
-        str(normalized.get("sentiment_summary", "") or "").strip(),
-        str(fallback.get("sentiment_summary", "") or "").strip(),
-    )
+    sentiment_summary = str(normalized.get("sentiment_summary", "") or "").strip()
+    if not _summary_has_depth(sentiment_summary):
+        sentiment_summary = _ensure_detailed_sentiment_summary(
+            sentiment_summary,
+            str(_fallback().get("sentiment_summary", "") or "").strip(),
+        )
 
     themes = normalized.get("themes") or []
     if not themes:
-        themes = fallback.get("themes") or []
+        themes = _fallback().get("themes") or []
 
     pain_points = normalized.get("pain_points") or []
     if not pain_points:
-        pain_points = fallback.get("pain_points") or []
+        pain_points = _fallback().get("pain_points") or []
     pain_points = _ensure_evidence_for_items(pain_points[:5], fallback_posts)
 
     wins = normalized.get("wins") or []
     if not wins:
-        wins = fallback.get("wins") or []
+        wins = _fallback().get("wins") or []
     wins = _ensure_evidence_for_items(wins[:5], fallback_posts)
 
     return {
@@ -518,9 +573,6 @@ async def _repair_json_payload_with_ai(raw_text: str, schema_hint: str) -> Optio
         return None
 
     try:
-        import openai
-
-        openai.api_key = api_key
         prompt = (
             "Convert the following model output into valid JSON only. Do not add commentary. "
             f"Schema hint: {schema_hint}.\n\n"
@@ -528,20 +580,22 @@ async def _repair_json_payload_with_ai(raw_text: str, schema_hint: str) -> Optio
             + raw_excerpt[:3500]
         )
 
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You repair invalid JSON. Return strict JSON only."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.0,
-            max_tokens=700,
+        repaired_text = await _openai_chat_completion(
+            api_key,
+            {
+                "model": "gpt-4o-mini",
+                "messages": [
+                    {"role": "system", "content": "You repair invalid JSON. Return strict JSON only."},
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": 0.0,
+                "max_tokens": 700,
+                "response_format": {"type": "json_object"},
+            },
         )
-
-        repaired_text = response.choices[0].message.content or ""
         return _extract_json_payload(repaired_text)
     except Exception as exc:
-        print(f"JSON repair failed ({schema_hint}): {exc}")
+        logger.warning("JSON repair failed (%s): %s", schema_hint, exc)
         return None
 
 
@@ -552,49 +606,58 @@ async def analyze_posts_with_ai(
     keywords: str = "",
 ) -> Dict[str, Any]:
     """Analyze Reddit posts/comments with OpenAI and return normalized sentiment output."""
+    if not posts:
+        # Comments are sampled from posts, so there is nothing to analyse; skip the round trip.
+        return ensure_valid_analysis_schema({}, posts, game_name=game_name)
+
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        print("OpenAI key missing; using deterministic analysis fallback.")
+        logger.warning("OpenAI key missing; using deterministic analysis fallback.")
         return ensure_valid_analysis_schema({}, posts, game_name=game_name)
 
     try:
-        import openai
-
-        openai.api_key = api_key
         prompt = _build_analysis_prompt(posts, comments, game_name=game_name, keywords=keywords)
 
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert gaming community analyst. "
-                        "Return valid JSON only and avoid quoting toxic content directly."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-            max_tokens=1800,
+        text, finish_reason = await _openai_chat_completion_with_finish_reason(
+            api_key,
+            {
+                "model": "gpt-4o-mini",
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": (
+                            "You are an expert gaming community analyst. "
+                            "Return valid JSON only and avoid quoting toxic content directly."
+                        ),
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": 0.2,
+                "max_tokens": 1800,
+                "response_format": {"type": "json_object"},
+            },
         )
-
-        text = response.choices[0].message.content or ""
         parsed = _extract_json_payload(text)
+        if parsed is None and finish_reason == "length":
+            # A reply truncated at max_tokens is still a valid JSON prefix, so salvage it locally
+            # rather than paying for a repair round trip.
+            parsed = _extract_partial_json_payload(text)
+            if parsed is not None:
+                logger.info("Overall analysis truncated at max_tokens; partial JSON used.")
         if parsed is None:
-            print(f"Overall analysis parse failed. Raw excerpt: {text[:300]!r}")
+            logger.warning("Overall analysis parse failed. Raw excerpt: %r", text[:300])
             repaired = await _repair_json_payload_with_ai(text, "overall_analysis")
             if repaired is not None:
-                print("Overall analysis JSON repair used.")
+                logger.info("Overall analysis JSON repair used.")
                 parsed = repaired
 
         if parsed is None:
-            print("Overall analysis fallback used after parse/repair failure.")
+            logger.warning("Overall analysis fallback used after parse/repair failure.")
             return ensure_valid_analysis_schema({}, posts, game_name=game_name)
 
         return ensure_valid_analysis_schema(parsed, posts, game_name=game_name)
     except Exception as exc:
-        print(f"Overall analysis failed: {exc}")
+        logger.warning("Overall analysis failed: %s", exc)
         return ensure_valid_analysis_schema({}, posts, game_name=game_name)
 
 
@@ -612,4 +675,7 @@ async def analyze_subreddit_with_ai(
 
 
 def _extract_post_ids(text: str) -> List[str]:
-    return re.findall(r"\[POST:([A-Za-z0-9_]+)\]", text or "")
+    # Most insight and theme strings carry no tags; a substring check is cheaper than a regex scan.
+    if not text or "[POST:" not in text:
+        return []
+    return _POST_TAG_RE.findall(text)
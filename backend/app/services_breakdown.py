@@ -1,42 +1,64 @@
 import asyncio
-import json
+import heapq
+import logging
 import os
 import re
 import time
-from typing import Any, Dict, List
+from itertools import chain, cycle, islice
+from typing import Any, Dict, List, Optional, Tuple
 
 from .services_analysis import (
+    _INSUFFICIENT_PAIN_TEXT,
+    _INSUFFICIENT_WIN_TEXT,
+    _annotate_posts,
     _ensure_evidence_for_items,
     _extract_post_ids,
     _extract_theme_phrases_from_titles,
-    _has_negative_signal,
-    _has_positive_signal,
+    _insight_item_post_ids,
+    _insight_item_text,
     _normalize_evidence_links,
     _normalize_insight_items,
     _normalize_sentiment_label,
     _normalize_themes,
-    _post_signal_blob,
-    _post_engagement_weight,
+    _repair_json_payload_with_ai,
+    _weighted_sentiment_label,
     analyze_posts_with_ai,
     analyze_subreddit_with_ai,
 )
 from .services_common import (
+    BREAKDOWN_AI_CONCURRENCY,
+    BREAKDOWN_BATCH_MAX_TOKENS,
+    BREAKDOWN_BATCH_TOKENS_PER_SUBREDDIT,
     BREAKDOWN_MAX_POSTS_PER_SUBREDDIT,
     BREAKDOWN_SELFTEXT_TRUNCATE,
     MAX_COMMENTS_PER_POST,
     MAX_MULTI_SUBREDDITS,
     MULTI_SCAN_CACHE_TTL,
     TOP_POSTS_FOR_COMMENTS,
+    _REDDIT_LINK_RE,
     _calculate_post_rank,
+    _extract_json_payload,
+    _extract_partial_json_payload,
     _format_permalink,
     _multi_scan_cache,
     _normalize_game_lookup_key,
     _normalize_subreddit,
+    _openai_chat_completion_with_finish_reason,
     _subreddit_breakdown_cache,
     _tokenize_text,
 )
 from .services_fetch import fetch_posts_for_subreddits, sample_comments_for_posts
 
+logger = logging.getLogger(__name__)
+
+_SEGMENT_SPLIT_RE = re.compile(r"[\n\r]+|\.\s+")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_INSUFFICIENT_SUBREDDIT_THEMES = (
+    "Insufficient subreddit signal - not enough high-engagement product feedback",
+    "Insufficient subreddit signal - unable to extract repeated subtopics",
+    "Insufficient subreddit signal - rerun scan after more activity",
+)
+
 def _normalize_subreddit_list(subreddits: List[str], max_items: int = MAX_MULTI_SUBREDDITS) -> List[str]:
     unique: List[str] = []
     seen = set()
@@ -61,28 +83,29 @@ def _build_multi_scan_cache_key(
     game_name: str,
     keywords: str,
     include_breakdown: bool,
-) -> str:
-    payload = {
-        "subreddits": sorted([s.lower() for s in subreddits]),
-        "game_name": _normalize_game_lookup_key(game_name),
-        "keywords": " ".join(_tokenize_text(keywords)),
-        "include_breakdown": bool(include_breakdown),
-    }
-    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+) -> Tuple[Tuple[str, ...], str, Tuple[str, ...], bool]:
+    # Plain tuples hash and compare structurally, so no serialisation is needed for a dict key.
+    return (
+        tuple(sorted(s.lower() for s in subreddits)),
+        _normalize_game_lookup_key(game_name),
+        tuple(_tokenize_text(keywords)),
+        bool(include_breakdown),
+    )
 
 
 def _build_posts_by_subreddit(posts: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    # Each group comes back as its rank-ordered top slice, so consumers can pass ranked=True.
     grouped: Dict[str, List[Dict[str, Any]]] = {}
     for post in posts:
-        subreddit = _normalize_subreddit(str(post.get("subreddit", "") or ""))
+        subreddit = _normalize_subreddit(post["subreddit"])
         if not subreddit:
             continue
         grouped.setdefault(subreddit, []).append(post)
 
     for subreddit, subreddit_posts in list(grouped.items()):
-        grouped[subreddit] = sorted(subreddit_posts, key=_calculate_post_rank, reverse=True)[
-            :BREAKDOWN_MAX_POSTS_PER_SUBREDDIT
-        ]
+        grouped[subreddit] = heapq.nlargest(
+            BREAKDOWN_MAX_POSTS_PER_SUBREDDIT, subreddit_posts, key=_calculate_post_rank
+        )
 
     return grouped
 
@@ -91,27 +114,33 @@ def _build_breakdown_prompt(
     posts_by_subreddit: Dict[str, List[Dict[str, Any]]],
     game_name: str,
     keywords: str,
+    comments_by_subreddit: Optional[Dict[str, List[Dict[str, Any]]]] = None,
 ) -> str:
     sections: List[str] = []
+    comments_by_subreddit = comments_by_subreddit or {}
 
     for subreddit in sorted(posts_by_subreddit.keys()):
         posts = posts_by_subreddit.get(subreddit, [])[:BREAKDOWN_MAX_POSTS_PER_SUBREDDIT]
         lines = [f"SUBREDDIT: r/{subreddit}", f"POST_COUNT: {len(posts)}"]
 
         for idx, post in enumerate(posts):
-            post_id = str(post.get("id") or "")
-            title = str(post.get("title", "") or "").strip()
-            score = int(post.get("score", 0) or 0)
-            num_comments = int(post.get("num_comments", 0) or 0)
-            lines.append(f"- [POST:{post_id}] [{score} pts, {num_comments} comments] {title}")
+            lines.append(
+                f"- [POST:{post['id']}] [{post['score']} pts, {post['num_comments']} comments] {post['title'].strip()}"
+            )
 
             if idx < 4:
-                selftext = str(post.get("selftext", "") or "").strip()
+                selftext = post["selftext"].strip()
                 if selftext and selftext not in ("[removed]", "[deleted]"):
-                    snippet = selftext.replace("\n", " ")[:BREAKDOWN_SELFTEXT_TRUNCATE].strip()
+                    snippet = selftext[:BREAKDOWN_SELFTEXT_TRUNCATE].replace("\n", " ").strip()
                     if snippet:
                         lines.append(f"  Snippet: {snippet}")
 
+        comments = comments_by_subreddit.get(subreddit) or []
+        if comments:
+            lines.append("COMMENT SAMPLES FROM TOP POSTS:")
+            for comment in comments[: TOP_POSTS_FOR_COMMENTS * MAX_COMMENTS_PER_POST]:
+                lines.append(f"- [POST:{comment['source_post_id']}] [{comment['score']} pts] {comment['body']}")
+
         sections.append("\n".join(lines))
 
     keyword_note = f"\nKeywords to watch for: {keywords}" if keywords else ""
@@ -133,7 +162,7 @@ OUTPUT JSON ONLY with this exact top-level shape:
 }}
 
 STRICT RULES:
-- Use only supplied posts.
+- Use only supplied posts and comment samples.
 - Do NOT assume game genre, modes, platforms, monetisation, or mechanics unless explicitly present.
 - summary_bullets: max 3
 - top_themes: 3-5 and must be specific (not generic labels like "Gameplay Mechanics")
@@ -160,7 +189,7 @@ def _normalize_summary_bullets(value: Any) -> List[str]:
         text = value.strip()
         if not text:
             return []
-        segments = [seg.strip() for seg in re.split(r"[\n\r]+|\.\s+", text) if seg.strip()]
+        segments = [seg.strip() for seg in _SEGMENT_SPLIT_RE.split(text) if seg.strip()]
         return segments[:3]
 
     return []
@@ -175,35 +204,17 @@ def _normalize_breakdown_items(value: Any) -> List[Dict[str, Any]]:
         if not isinstance(raw_item, dict):
             continue
 
-        text = str(
-            raw_item.get("text")
-            or raw_item.get("summary")
-            or raw_item.get("point")
-            or raw_item.get("title")
-            or ""
-        ).strip()
+        text = _insight_item_text(raw_item)
         if not text:
             continue
 
         evidence = _normalize_evidence_links(raw_item.get("evidence"))
 
-        candidate_ids: List[str] = []
-        for key in ("post_id", "source_post_id", "id"):
-            raw_id = str(raw_item.get(key) or "").strip()
-            if raw_id and raw_id not in candidate_ids:
-                candidate_ids.append(raw_id)
-
-        for post_id in _extract_post_ids(text):
-            if post_id not in candidate_ids:
-                candidate_ids.append(post_id)
+        candidate_ids = _insight_item_post_ids(raw_item)
+        candidate_ids.update(dict.fromkeys(_extract_post_ids(text)))
 
         if not evidence and candidate_ids:
-            for post_id in candidate_ids:
-                link = _format_permalink(post_id)
-                if link not in evidence:
-                    evidence.append(link)
-                if len(evidence) >= 2:
-                    break
+            evidence = [_format_permalink(post_id) for post_id in list(candidate_ids)[:2]]
 
         items.append({"text": text, "evidence": evidence[:2]})
 
@@ -218,12 +229,11 @@ def _normalize_breakdown_payload(payload: Any) -> Dict[str, Any]:
         if not isinstance(raw_breakdown, list):
             for key in ("rows", "subreddits", "subreddit_breakdown"):
                 candidate = payload.get(key)
+                if isinstance(candidate, dict):
+                    candidate = candidate.get("breakdown")
                 if isinstance(candidate, list):
                     raw_breakdown = candidate
                     break
-                if isinstance(candidate, dict) and isinstance(candidate.get("breakdown"), list):
-                    raw_breakdown = candidate.get("breakdown")
-                    break
     elif isinstance(payload, list):
         raw_breakdown = payload
 
@@ -263,36 +273,27 @@ def _normalize_breakdown_payload(payload: Any) -> Dict[str, Any]:
     return {"breakdown": normalized_rows}
 
 
-def _estimate_sentiment_from_posts(posts: List[Dict[str, Any]]) -> str:
+def _estimate_sentiment_from_posts(
+    posts: List[Dict[str, Any]],
+    annotations: Optional[List[Tuple[float, bool, bool]]] = None,
+) -> str:
     if not posts:
         return "Mixed"
+    return _weighted_sentiment_label(annotations or _annotate_posts(posts))
 
-    positive_weight = 0.0
-    negative_weight = 0.0
 
-    for post in posts:
-        blob = _post_signal_blob(post)
-        weight = _post_engagement_weight(post)
-        if _has_positive_signal(blob):
-            positive_weight += weight
-        if _has_negative_signal(blob):
-            negative_weight += weight
-
-    if negative_weight > positive_weight * 1.15:
-        return "Negative"
-    if positive_weight > negative_weight * 1.15:
-        return "Positive"
-    return "Mixed"
-
-
-def _extract_theme_terms(posts: List[Dict[str, Any]], max_terms: int = 5) -> List[str]:
+def _extract_theme_terms(
+    posts: List[Dict[str, Any]],
+    max_terms: int = 5,
+    weights: Optional[List[float]] = None,
+) -> List[str]:
     # Use phrases from titles rather than isolated tokens to avoid noisy outputs.
-    return _extract_theme_phrases_from_titles(posts, max_phrases=max(max_terms, 1))
+    return _extract_theme_phrases_from_titles(posts, max_phrases=max(max_terms, 1), weights=weights)
 
 
 def _fallback_point_from_post(post: Dict[str, Any], prefix: str) -> Dict[str, Any]:
-    title = str(post.get("title", "") or "").strip()
-    post_id = str(post.get("id", "") or "").strip()
+    title = post["title"].strip()
+    post_id = post["id"].strip()
     evidence = [_format_permalink(post_id)] if post_id else []
 
     if not title:
@@ -304,70 +305,97 @@ def _fallback_point_from_post(post: Dict[str, Any], prefix: str) -> Dict[str, An
     }
 
 
+def _top_ranked_posts(posts: List[Dict[str, Any]], ranked: bool = False) -> List[Dict[str, Any]]:
+    # Callers that already hold a rank-ordered slice pass ranked=True to skip re-ranking it.
+    if ranked:
+        return list((posts or [])[:BREAKDOWN_MAX_POSTS_PER_SUBREDDIT])
+    return heapq.nlargest(BREAKDOWN_MAX_POSTS_PER_SUBREDDIT, posts or [], key=_calculate_post_rank)
+
+
+def _build_one_fallback_row(
+    subreddit: str,
+    posts: List[Dict[str, Any]],
+    ranked: bool = False,
+) -> Optional[Dict[str, Any]]:
+    top_posts = _top_ranked_posts(posts, ranked=ranked)
+    if not top_posts:
+        return None
+
+    annotations = _annotate_posts(top_posts)
+    sentiment_label = _estimate_sentiment_from_posts(top_posts, annotations)
+
+    # One walk over the ranked posts collects refs, theme weights and the signal-based picks.
+    post_refs: List[str] = []
+    weights: List[float] = []
+    negative_posts: List[Dict[str, Any]] = []
+    positive_posts: List[Dict[str, Any]] = []
+    for post, (weight, is_positive, is_negative) in zip(top_posts, annotations):
+        post_id = post["id"].strip()
+        if post_id:
+            post_refs.append(post_id)
+        weights.append(weight)
+        if is_negative:
+            negative_posts.append(post)
+        if is_positive:
+            positive_posts.append(post)
+
+    ref_one = post_refs[0] if post_refs else ""
+    ref_two = post_refs[1] if len(post_refs) > 1 else ref_one
+
+    phrases = _extract_theme_terms(top_posts, max_terms=5, weights=weights)
+    if not phrases:
+        phrases = ["content pacing feedback", "difficulty tuning feedback", "progression friction reports"]
+
+    summary_bullets = [
+        f"Overall sentiment in r/{subreddit} is {sentiment_label.lower()} based on high-engagement product discussions.",
+        f"Most repeated subtopics include {', '.join(phrases[:3])}.",
+        f"Representative threads: [POST:{ref_one}], [POST:{ref_two}]" if ref_one else "Representative threads are available in this community sample.",
+    ]
+
+    top_themes: List[str] = []
+    for idx, phrase in enumerate(phrases[:5]):
+        ref = post_refs[idx % len(post_refs)] if post_refs else ""
+        suffix = f" [POST:{ref}]" if ref else ""
+        top_themes.append(
+            f"{phrase.title()} - recurring product feedback trend in high-engagement posts{suffix}"
+        )
+    while len(top_themes) < 3:
+        ref = post_refs[len(top_themes) % len(post_refs)] if post_refs else ""
+        suffix = f" [POST:{ref}]" if ref else ""
+        top_themes.append(f"Product Feedback Signal - repeated issue/outcome in recent threads{suffix}")
+
+    # Without explicit signals, the lowest- and highest-ranked posts stand in as pain and win sources.
+    if not negative_posts:
+        negative_posts = top_posts[-3:]
+    if not positive_posts:
+        positive_posts = top_posts[:3]
+
+    pain_points: List[Dict[str, Any]] = []
+    wins: List[Dict[str, Any]] = []
+    for pain_post, win_post in zip(islice(cycle(negative_posts), 3), islice(cycle(positive_posts), 3)):
+        pain_points.append(_fallback_point_from_post(pain_post, "Players report friction around"))
+        wins.append(_fallback_point_from_post(win_post, "Players praise"))
+
+    return {
+        "subreddit": subreddit,
+        "sentiment_label": sentiment_label,
+        "summary_bullets": summary_bullets[:3],
+        "top_themes": top_themes[:5],
+        "top_pain_points": pain_points[:3],
+        "top_wins": wins[:3],
+    }
+
+
 def _build_fallback_breakdown_rows(
     posts_by_subreddit: Dict[str, List[Dict[str, Any]]],
+    ranked: bool = False,
 ) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
 
     for subreddit in sorted(posts_by_subreddit.keys()):
-        posts = sorted(posts_by_subreddit.get(subreddit, []), key=_calculate_post_rank, reverse=True)
-        if not posts:
-            continue
-
-        top_posts = posts[:BREAKDOWN_MAX_POSTS_PER_SUBREDDIT]
-        sentiment_label = _estimate_sentiment_from_posts(top_posts)
-        post_refs = [str(post.get("id") or "").strip() for post in top_posts if str(post.get("id") or "").strip()]
-
-        ref_one = post_refs[0] if post_refs else ""
-        ref_two = post_refs[1] if len(post_refs) > 1 else ref_one
-
-        phrases = _extract_theme_terms(top_posts, max_terms=5)
-        if not phrases:
-            phrases = ["content pacing feedback", "difficulty tuning feedback", "progression friction reports"]
-
-        summary_bullets = [
-            f"Overall sentiment in r/{subreddit} is {sentiment_label.lower()} based on high-engagement product discussions.",
-            f"Most repeated subtopics include {', '.join(phrases[:3])}.",
-            f"Representative threads: [POST:{ref_one}], [POST:{ref_two}]" if ref_one else "Representative threads are available in this community sample.",
-        ]
-
-        top_themes: List[str] = []
-        for idx, phrase in enumerate(phrases[:5]):
-            ref = post_refs[idx % len(post_refs)] if post_refs else ""
-            suffix = f" [POST:{ref}]" if ref else ""
-            top_themes.append(
-                f"{phrase.title()} - recurring product feedback trend in high-engagement posts{suffix}"
-            )
-        while len(top_themes) < 3:
-            ref = post_refs[len(top_themes) % len(post_refs)] if post_refs else ""
-            suffix = f" [POST:{ref}]" if ref else ""
-            top_themes.append(f"Product Feedback Signal - repeated issue/outcome in recent threads{suffix}")
-
-        negative_posts = [post for post in top_posts if _has_negative_signal(_post_signal_blob(post))]
-        positive_posts = [post for post in top_posts if _has_positive_signal(_post_signal_blob(post))]
-        if not negative_posts:
-            negative_posts = top_posts[-3:] if len(top_posts) >= 3 else top_posts
-        if not positive_posts:
-            positive_posts = top_posts[:3]
-
-        pain_points: List[Dict[str, Any]] = []
-        wins: List[Dict[str, Any]] = []
-        for idx in range(3):
-            pain_post = negative_posts[idx % len(negative_posts)]
-            win_post = positive_posts[idx % len(positive_posts)]
-            pain_points.append(_fallback_point_from_post(pain_post, "Players report friction around"))
-            wins.append(_fallback_point_from_post(win_post, "Players praise"))
-
-        rows.append(
-            {
-                "subreddit": subreddit,
-                "sentiment_label": sentiment_label,
-                "summary_bullets": summary_bullets[:3],
-                "top_themes": top_themes[:5],
-                "top_pain_points": pain_points[:3],
-                "top_wins": wins[:3],
-            }
-        )
+        row = _build_one_fallback_row(subreddit, posts_by_subreddit.get(subreddit, []), ranked=ranked)
+        if row is not None:
+            rows.append(row)
 
     return rows
 
@@ -376,7 +404,7 @@ def _build_fallback_breakdown(
     posts_by_subreddit: Dict[str, List[Dict[str, Any]]],
     error_message: str,
 ) -> Dict[str, Any]:
-    print(f"Breakdown fallback used: {error_message}")
+    logger.warning("Breakdown fallback used: %s", error_message)
     return {"error": "fallback_generated", "breakdown": _build_fallback_breakdown_rows(posts_by_subreddit)}
 
 
@@ -384,12 +412,6 @@ def _merge_breakdown_with_fallback(
     normalized_payload: Dict[str, Any],
     posts_by_subreddit: Dict[str, List[Dict[str, Any]]],
 ) -> List[Dict[str, Any]]:
-    fallback_rows_by_subreddit = {
-        row.get("subreddit"): row
-        for row in _build_fallback_breakdown_rows(posts_by_subreddit)
-        if isinstance(row, dict) and row.get("subreddit")
-    }
-
     parsed_rows_by_subreddit: Dict[str, Dict[str, Any]] = {}
     for row in normalized_payload.get("breakdown", []):
         if not isinstance(row, dict):
@@ -402,17 +424,20 @@ def _merge_breakdown_with_fallback(
     merged_rows: List[Dict[str, Any]] = []
 
     for subreddit in sorted(posts_by_subreddit.keys()):
-        fallback_row = fallback_rows_by_subreddit.get(subreddit)
-        if not fallback_row:
+        subreddit_posts = posts_by_subreddit.get(subreddit, [])
+        if not subreddit_posts:
             continue
 
+        # Fallback rows are built per subreddit, and only where the parsed row cannot be used as-is.
         parsed_row = parsed_rows_by_subreddit.get(subreddit)
         if not parsed_row:
-            merged_rows.append(fallback_row)
+            merged_rows.append(_build_one_fallback_row(subreddit, subreddit_posts))
             continue
 
+        fallback_row: Optional[Dict[str, Any]] = None
         sentiment_label = _normalize_sentiment_label(parsed_row.get("sentiment_label"))
         if sentiment_label == "Unknown":
+            fallback_row = _build_one_fallback_row(subreddit, subreddit_posts)
             sentiment_label = str(fallback_row.get("sentiment_label", "Mixed"))
 
         summary_bullets = _normalize_summary_bullets(parsed_row.get("summary_bullets"))
@@ -420,7 +445,6 @@ def _merge_breakdown_with_fallback(
         top_pain_points = _normalize_breakdown_items(parsed_row.get("top_pain_points"))
         top_wins = _normalize_breakdown_items(parsed_row.get("top_wins"))
 
-        subreddit_posts = posts_by_subreddit.get(subreddit, [])
         top_pain_points = _ensure_evidence_for_items(top_pain_points, subreddit_posts)[:3]
         top_wins = _ensure_evidence_for_items(top_wins, subreddit_posts)[:3]
 
@@ -432,7 +456,7 @@ def _merge_breakdown_with_fallback(
         )
 
         if not quality_ok:
-            merged_rows.append(fallback_row)
+            merged_rows.append(fallback_row or _build_one_fallback_row(subreddit, subreddit_posts))
             continue
 
         merged_rows.append(
@@ -454,20 +478,22 @@ def _build_subreddit_breakdown_cache_key(
     posts: List[Dict[str, Any]],
     game_name: str,
     keywords: str,
-) -> str:
-    ranked_posts = sorted(posts or [], key=_calculate_post_rank, reverse=True)[:BREAKDOWN_MAX_POSTS_PER_SUBREDDIT]
-    top_post_ids = [str(post.get("id") or "").strip() for post in ranked_posts if str(post.get("id") or "").strip()]
-    payload = {
-        "subreddit": _normalize_subreddit(subreddit).lower(),
-        "game_name": _normalize_game_lookup_key(game_name),
-        "keywords": " ".join(_tokenize_text(keywords)),
-        "post_ids": top_post_ids,
-    }
-    return json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    ranked: bool = False,
+) -> Tuple[str, str, Tuple[str, ...], Tuple[str, ...]]:
+    ranked_posts = _top_ranked_posts(posts, ranked=ranked)
+    top_post_ids = tuple(post["id"].strip() for post in ranked_posts if post["id"].strip())
+    return (
+        _normalize_subreddit(subreddit).lower(),
+        _normalize_game_lookup_key(game_name),
+        tuple(_tokenize_text(keywords)),
+        top_post_ids,
+    )
 
 
 def _extract_post_id_from_evidence_link(link: str) -> str:
-    match = re.search(r"reddit\.com/comments/([a-z0-9_]+)", str(link or ""), re.IGNORECASE)
+    if not link:
+        return ""
+    match = _REDDIT_LINK_RE.search(link if isinstance(link, str) else str(link))
     if match:
         return str(match.group(1)).strip()
     return ""
@@ -478,9 +504,10 @@ def _first_sentence(text: str) -> str:
     if not value:
         return ""
 
-    parts = [part.strip() for part in re.split(r"(?<=[.!?])\s+", value) if part.strip()]
-    if parts:
-        return parts[0]
+    # Only the leading sentence is needed, so stop splitting after the first boundary.
+    first = _SENTENCE_SPLIT_RE.split(value, maxsplit=1)[0].strip()
+    if first:
+        return first
 
     return value[:220].strip()
 
@@ -490,21 +517,29 @@ def _extract_representative_post_ids(
     wins: List[Dict[str, Any]],
     posts: List[Dict[str, Any]],
     max_ids: int = 2,
+    ranked: bool = False,
 ) -> List[str]:
     ids: List[str] = []
+    seen = set()
 
-    for item in (pain_points + wins):
+    for item in chain(pain_points, wins):
         evidence = _normalize_evidence_links(item.get("evidence")) if isinstance(item, dict) else []
         for link in evidence:
             post_id = _extract_post_id_from_evidence_link(link)
-            if post_id and post_id not in ids:
+            if post_id and post_id not in seen:
+                seen.add(post_id)
                 ids.append(post_id)
             if len(ids) >= max_ids:
                 return ids
 
-    for post in sorted(posts or [], key=_calculate_post_rank, reverse=True):
-        post_id = str(post.get("id") or "").strip()
-        if post_id and post_id not in ids:
+    if len(ids) >= max_ids:
+        return ids[:max_ids]
+
+    ordered_posts = (posts or []) if ranked else sorted(posts or [], key=_calculate_post_rank, reverse=True)
+    for post in ordered_posts:
+        post_id = post["id"].strip()
+        if post_id and post_id not in seen:
+            seen.add(post_id)
             ids.append(post_id)
         if len(ids) >= max_ids:
             break
@@ -512,11 +547,15 @@ def _extract_representative_post_ids(
     return ids[:max_ids]
 
 
-def _build_single_subreddit_fallback_row(subreddit: str, posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _build_single_subreddit_fallback_row(
+    subreddit: str,
+    posts: List[Dict[str, Any]],
+    ranked: bool = False,
+) -> Dict[str, Any]:
     normalized_subreddit = _normalize_subreddit(subreddit) or subreddit
-    fallback_rows = _build_fallback_breakdown_rows({normalized_subreddit: posts or []})
-    if fallback_rows:
-        return fallback_rows[0]
+    fallback_row = _build_one_fallback_row(normalized_subreddit, posts or [], ranked=ranked)
+    if fallback_row is not None:
+        return fallback_row
 
     return {
         "subreddit": normalized_subreddit,
@@ -526,21 +565,9 @@ def _build_single_subreddit_fallback_row(subreddit: str, posts: List[Dict[str, A
             "Insufficient subreddit-level data to produce a reliable AI summary.",
             "Representative threads are available in the sampled posts.",
         ],
-        "top_themes": [
-            "Insufficient subreddit signal - not enough high-engagement product feedback",
-            "Insufficient subreddit signal - unable to extract repeated subtopics",
-            "Insufficient subreddit signal - rerun scan after more activity",
-        ],
-        "top_pain_points": [
-            {"text": "Insufficient data to identify repeated pain points.", "evidence": []},
-            {"text": "Insufficient data to identify repeated pain points.", "evidence": []},
-            {"text": "Insufficient data to identify repeated pain points.", "evidence": []},
-        ],
-        "top_wins": [
-            {"text": "Insufficient data to identify repeated wins.", "evidence": []},
-            {"text": "Insufficient data to identify repeated wins.", "evidence": []},
-            {"text": "Insufficient data to identify repeated wins.", "evidence": []},
-        ],
+        "top_themes": list(_INSUFFICIENT_SUBREDDIT_THEMES),
+        "top_pain_points": [{"text": _INSUFFICIENT_PAIN_TEXT, "evidence": []} for _ in range(3)],
+        "top_wins": [{"text": _INSUFFICIENT_WIN_TEXT, "evidence": []} for _ in range(3)],
     }
 
 
@@ -548,50 +575,68 @@ def _map_analysis_to_breakdown_row(
     subreddit: str,
     posts: List[Dict[str, Any]],
     analysis: Dict[str, Any],
+    ranked: bool = False,
 ) -> Dict[str, Any]:
-    fallback_row = _build_single_subreddit_fallback_row(subreddit, posts)
+    normalized_subreddit = _normalize_subreddit(subreddit) or subreddit
+    # The deterministic row is only built when the analysis leaves a gap to fill, and at most once.
+    fallback_cache: Dict[str, Any] = {}
+
+    def _fallback_row() -> Dict[str, Any]:
+        if not fallback_cache:
+            fallback_cache.update(_build_single_subreddit_fallback_row(normalized_subreddit, posts, ranked=ranked))
+        return fallback_cache
 
     sentiment_label = _normalize_sentiment_label(analysis.get("sentiment_label"))
     if sentiment_label == "Unknown":
-        sentiment_label = str(fallback_row.get("sentiment_label") or "Mixed")
+        sentiment_label = str(_fallback_row().get("sentiment_label") or "Mixed")
 
     themes = _normalize_themes(analysis.get("themes"))[:5]
-    fallback_themes = [str(item).strip() for item in fallback_row.get("top_themes", []) if str(item).strip()]
-    for fallback_theme in fallback_themes:
-        if len(themes) >= 3:
-            break
-        if fallback_theme not in themes:
-            themes.append(fallback_theme)
+    if len(themes) < 3:
+        fallback_themes = [str(item).strip() for item in _fallback_row().get("top_themes", []) if str(item).strip()]
+        seen_themes = set(themes)
+        for fallback_theme in fallback_themes:
+            if len(themes) >= 3:
+                break
+            if fallback_theme not in seen_themes:
+                seen_themes.add(fallback_theme)
+                themes.append(fallback_theme)
     themes = themes[:5]
 
     pain_points = _normalize_insight_items(analysis.get("pain_points"))[:3]
     pain_points = _ensure_evidence_for_items(pain_points, posts)[:3]
-    fallback_pain = fallback_row.get("top_pain_points", []) if isinstance(fallback_row.get("top_pain_points"), list) else []
+    fallback_pain: List[Dict[str, Any]] = []
+    if len(pain_points) < 3:
+        fallback_row = _fallback_row()
+        fallback_pain = fallback_row.get("top_pain_points", []) if isinstance(fallback_row.get("top_pain_points"), list) else []
     while len(pain_points) < 3:
         idx = len(pain_points)
-        candidate = fallback_pain[idx % len(fallback_pain)] if fallback_pain else {"text": "Insufficient data to identify repeated pain points.", "evidence": []}
+        candidate = fallback_pain[idx % len(fallback_pain)] if fallback_pain else {"text": _INSUFFICIENT_PAIN_TEXT, "evidence": []}
         pain_points.append({
-            "text": str(candidate.get("text") or "Insufficient data to identify repeated pain points."),
+            "text": str(candidate.get("text") or _INSUFFICIENT_PAIN_TEXT),
             "evidence": _normalize_evidence_links(candidate.get("evidence")),
         })
 
     wins = _normalize_insight_items(analysis.get("wins"))[:3]
     wins = _ensure_evidence_for_items(wins, posts)[:3]
-    fallback_wins = fallback_row.get("top_wins", []) if isinstance(fallback_row.get("top_wins"), list) else []
+    fallback_wins: List[Dict[str, Any]] = []
+    if len(wins) < 3:
+        fallback_row = _fallback_row()
+        fallback_wins = fallback_row.get("top_wins", []) if isinstance(fallback_row.get("top_wins"), list) else []
     while len(wins) < 3:
         idx = len(wins)
-        candidate = fallback_wins[idx % len(fallback_wins)] if fallback_wins else {"text": "Insufficient data to identify repeated wins.", "evidence": []}
+        candidate = fallback_wins[idx % len(fallback_wins)] if fallback_wins else {"text": _INSUFFICIENT_WIN_TEXT, "evidence": []}
         wins.append({
-            "text": str(candidate.get("text") or "Insufficient data to identify repeated wins."),
+            "text": str(candidate.get("text") or _INSUFFICIENT_WIN_TEXT),
             "evidence": _normalize_evidence_links(candidate.get("evidence")),
         })
 
     summary_text = _first_sentence(str(analysis.get("sentiment_summary") or ""))
     if not summary_text:
+        fallback_row = _fallback_row()
         fallback_summary = fallback_row.get("summary_bullets", []) if isinstance(fallback_row.get("summary_bullets"), list) else []
         summary_text = str(fallback_summary[1] if len(fallback_summary) > 1 else "Subreddit-level signal was extracted from top community threads.")
 
-    representative_ids = _extract_representative_post_ids(pain_points, wins, posts, max_ids=2)
+    representative_ids = _extract_representative_post_ids(pain_points, wins, posts, max_ids=2, ranked=ranked)
     if representative_ids:
         if len(representative_ids) == 1:
             representative_line = f"Representative threads: [POST:{representative_ids[0]}]"
@@ -601,10 +646,10 @@ def _map_analysis_to_breakdown_row(
         representative_line = "Representative threads are available in the sampled posts."
 
     return {
-        "subreddit": _normalize_subreddit(subreddit) or subreddit,
+        "subreddit": normalized_subreddit,
         "sentiment_label": sentiment_label,
         "summary_bullets": [
-            f"Overall sentiment in r/{_normalize_subreddit(subreddit) or subreddit} is {sentiment_label.lower()}.",
+            f"Overall sentiment in r/{normalized_subreddit} is {sentiment_label.lower()}.",
             summary_text,
             representative_line,
         ][:3],
@@ -614,23 +659,38 @@ def _map_analysis_to_breakdown_row(
     }
 
 
+async def _sample_breakdown_comments(ranked_posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    try:
+        return await sample_comments_for_posts(
+            ranked_posts,
+            max_posts=min(6, TOP_POSTS_FOR_COMMENTS),
+            max_comments_per_post=MAX_COMMENTS_PER_POST,
+        )
+    except Exception:
+        return []
+
+
 async def _analyze_one_subreddit_breakdown_row(
     subreddit: str,
     posts: List[Dict[str, Any]],
     game_name: str,
     keywords: str,
     semaphore: asyncio.Semaphore,
+    ranked: bool = False,
+    comments: Optional[List[Dict[str, Any]]] = None,
 ) -> Dict[str, Any]:
     normalized_subreddit = _normalize_subreddit(subreddit) or subreddit
-    ranked_posts = sorted(posts or [], key=_calculate_post_rank, reverse=True)[:BREAKDOWN_MAX_POSTS_PER_SUBREDDIT]
+    # Rank once here; every helper below receives the ordered slice with ranked=True.
+    ranked_posts = _top_ranked_posts(posts, ranked=ranked)
     if not ranked_posts:
-        return _build_single_subreddit_fallback_row(normalized_subreddit, ranked_posts)
+        return _build_single_subreddit_fallback_row(normalized_subreddit, ranked_posts, ranked=True)
 
     cache_key = _build_subreddit_breakdown_cache_key(
         normalized_subreddit,
         ranked_posts,
         game_name=game_name,
         keywords=keywords,
+        ranked=True,
     )
 
     now = time.time()
@@ -639,14 +699,8 @@ async def _analyze_one_subreddit_breakdown_row(
         return cached_row[1]
 
     try:
-        try:
-            subreddit_comments = await sample_comments_for_posts(
-                ranked_posts,
-                max_posts=min(6, TOP_POSTS_FOR_COMMENTS),
-                max_comments_per_post=MAX_COMMENTS_PER_POST,
-            )
-        except Exception:
-            subreddit_comments = []
+        # Comments already sampled for the batched call are reused rather than fetched again.
+        subreddit_comments = comments if comments is not None else await _sample_breakdown_comments(ranked_posts)
 
         async with semaphore:
             analysis = await analyze_subreddit_with_ai(
@@ -657,20 +711,102 @@ async def _analyze_one_subreddit_breakdown_row(
                 keywords=keywords,
             )
 
-        row = _map_analysis_to_breakdown_row(normalized_subreddit, ranked_posts, analysis)
+        row = _map_analysis_to_breakdown_row(normalized_subreddit, ranked_posts, analysis, ranked=True)
         _subreddit_breakdown_cache[cache_key] = (now, row)
         return row
     except Exception as exc:
-        print(f"Subreddit breakdown failed for r/{normalized_subreddit}: {exc}")
-        row = _build_single_subreddit_fallback_row(normalized_subreddit, ranked_posts)
+        logger.warning("Subreddit breakdown failed for r/%s: %s", normalized_subreddit, exc)
+        row = _build_single_subreddit_fallback_row(normalized_subreddit, ranked_posts, ranked=True)
         _subreddit_breakdown_cache[cache_key] = (now, row)
         return row
 
 
+def _batched_row_to_analysis(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    summary_bullets = row.get("summary_bullets") or []
+    themes = row.get("top_themes") or []
+    pain_points = row.get("top_pain_points") or []
+    wins = row.get("top_wins") or []
+    if not summary_bullets or len(themes) < 3 or len(pain_points) < 3 or len(wins) < 3:
+        return None
+
+    return {
+        "sentiment_label": row.get("sentiment_label"),
+        "sentiment_summary": summary_bullets[0],
+        "themes": themes,
+        "pain_points": pain_points,
+        "wins": wins,
+    }
+
+
+async def analyze_subreddits_batched_with_ai(
+    posts_by_subreddit: Dict[str, List[Dict[str, Any]]],
+    comments_by_subreddit: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    game_name: str = "",
+    keywords: str = "",
+) -> Dict[str, Dict[str, Any]]:
+    """Analyze several subreddits in one OpenAI call; returns analyses only for rows that validate."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key or not posts_by_subreddit:
+        return {}
+
+    prompt = _build_breakdown_prompt(
+        posts_by_subreddit,
+        game_name=game_name,
+        keywords=keywords,
+        comments_by_subreddit=comments_by_subreddit,
+    )
+    text, finish_reason = await _openai_chat_completion_with_finish_reason(
+        api_key,
+        {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": (
+                        "You are an expert gaming community analyst. "
+                        "Return valid JSON only and avoid quoting toxic content directly."
+                    ),
+                },
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.2,
+            "max_tokens": min(
+                BREAKDOWN_BATCH_TOKENS_PER_SUBREDDIT * len(posts_by_subreddit),
+                BREAKDOWN_BATCH_MAX_TOKENS,
+            ),
+            "response_format": {"type": "json_object"},
+        },
+    )
+    parsed = _extract_json_payload(text)
+    if parsed is None and finish_reason == "length":
+        # Rows completed before the cut-off are kept; any row missing from the salvaged
+        # payload falls back to its own per-subreddit call.
+        parsed = _extract_partial_json_payload(text)
+        if parsed is not None:
+            logger.info("Batched breakdown truncated at max_tokens; partial JSON used.")
+    if parsed is None:
+        parsed = await _repair_json_payload_with_ai(text, "subreddit_breakdown")
+    if parsed is None:
+        return {}
+
+    subreddits_by_lower = {subreddit.lower(): subreddit for subreddit in posts_by_subreddit}
+    analyses: Dict[str, Dict[str, Any]] = {}
+    for row in _normalize_breakdown_payload(parsed).get("breakdown", []):
+        subreddit = subreddits_by_lower.get(row["subreddit"].lower())
+        if subreddit is None or subreddit in analyses:
+            continue
+        analysis = _batched_row_to_analysis(row)
+        if analysis is not None:
+            analyses[subreddit] = analysis
+
+    return analyses
+
+
 async def analyze_subreddit_breakdown_with_ai(
     posts_by_subreddit: Dict[str, List[Dict[str, Any]]],
     game_name: str = "",
     keywords: str = "",
+    ranked: bool = False,
 ) -> Dict[str, Any]:
     if not posts_by_subreddit:
         return {"breakdown": []}
@@ -679,44 +815,100 @@ async def analyze_subreddit_breakdown_with_ai(
     if not api_key:
         return {
             "error": "fallback_generated",
-            "breakdown": _build_fallback_breakdown_rows(posts_by_subreddit),
+            "breakdown": _build_fallback_breakdown_rows(posts_by_subreddit, ranked=ranked),
         }
 
-    semaphore = asyncio.Semaphore(2)
     ordered_subreddits = sorted(posts_by_subreddit.keys())
+    ranked_by_subreddit = {
+        subreddit: _top_ranked_posts(posts_by_subreddit.get(subreddit, []), ranked=ranked)
+        for subreddit in ordered_subreddits
+    }
 
+    # Warm subreddits come straight from the per-subreddit cache; the cold ones share a
+    # single batched call, and only rows that come back missing or invalid get their own call.
+    now = time.time()
+    rows_by_subreddit: Dict[str, Dict[str, Any]] = {}
+    cold_cache_keys: Dict[str, Tuple[Any, ...]] = {}
+    for subreddit in ordered_subreddits:
+        ranked_posts = ranked_by_subreddit[subreddit]
+        if not ranked_posts:
+            continue
+        cache_key = _build_subreddit_breakdown_cache_key(
+            _normalize_subreddit(subreddit) or subreddit,
+            ranked_posts,
+            game_name=game_name,
+            keywords=keywords,
+            ranked=True,
+        )
+        cached_row = _subreddit_breakdown_cache.get(cache_key)
+        if cached_row and now - cached_row[0] < MULTI_SCAN_CACHE_TTL:
+            rows_by_subreddit[subreddit] = cached_row[1]
+        else:
+            cold_cache_keys[subreddit] = cache_key
+
+    comments_by_subreddit: Dict[str, List[Dict[str, Any]]] = {}
+    if len(cold_cache_keys) > 1:
+        cold_subreddits = list(cold_cache_keys)
+        sampled_comments = await asyncio.gather(
+            *[_sample_breakdown_comments(ranked_by_subreddit[subreddit]) for subreddit in cold_subreddits]
+        )
+        comments_by_subreddit = dict(zip(cold_subreddits, sampled_comments))
+        try:
+            batched_analyses = await analyze_subreddits_batched_with_ai(
+                {subreddit: ranked_by_subreddit[subreddit] for subreddit in cold_subreddits},
+                comments_by_subreddit,
+                game_name=game_name,
+                keywords=keywords,
+            )
+        except Exception as exc:
+            logger.warning("Batched subreddit breakdown failed: %s", exc)
+            batched_analyses = {}
+
+        for subreddit, analysis in batched_analyses.items():
+            row = _map_analysis_to_breakdown_row(subreddit, ranked_by_subreddit[subreddit], analysis, ranked=True)
+            _subreddit_breakdown_cache[cold_cache_keys[subreddit]] = (now, row)
+            rows_by_subreddit[subreddit] = row
+
+    # Tasks without comments from the batched step sample them before queueing on the semaphore,
+    # so comment fetches overlap with the AI calls already in flight; only the AI step is bounded.
+    semaphore = asyncio.Semaphore(BREAKDOWN_AI_CONCURRENCY)
+    pending_subreddits = [subreddit for subreddit in ordered_subreddits if subreddit not in rows_by_subreddit]
     tasks = [
         _analyze_one_subreddit_breakdown_row(
             subreddit,
-            posts_by_subreddit.get(subreddit, []),
+            ranked_by_subreddit[subreddit],
             game_name=game_name,
             keywords=keywords,
             semaphore=semaphore,
+            ranked=True,
+            comments=comments_by_subreddit.get(subreddit),
         )
-        for subreddit in ordered_subreddits
+        for subreddit in pending_subreddits
     ]
 
-    rows: List[Dict[str, Any]] = []
     results = await asyncio.gather(*tasks, return_exceptions=True)
-    for idx, result in enumerate(results):
-        subreddit = ordered_subreddits[idx]
+    for subreddit, result in zip(pending_subreddits, results):
         subreddit_posts = posts_by_subreddit.get(subreddit, [])
 
         if isinstance(result, Exception):
-            print(f"Subreddit breakdown task failed for r/{subreddit}: {result}")
-            rows.append(_build_single_subreddit_fallback_row(subreddit, subreddit_posts))
+            logger.warning("Subreddit breakdown task failed for r/%s: %s", subreddit, result)
+            rows_by_subreddit[subreddit] = _build_single_subreddit_fallback_row(subreddit, subreddit_posts)
             continue
 
         if not isinstance(result, dict):
-            rows.append(_build_single_subreddit_fallback_row(subreddit, subreddit_posts))
+            rows_by_subreddit[subreddit] = _build_single_subreddit_fallback_row(subreddit, subreddit_posts)
             continue
 
-        rows.append(result)
+        rows_by_subreddit[subreddit] = result
 
-    return {"breakdown": rows}
+    return {"breakdown": [rows_by_subreddit[subreddit] for subreddit in ordered_subreddits]}
 
 
-def _public_multi_scan_result(result: Dict[str, Any]) -> Dict[str, Any]:
+def _public_multi_scan_result(result: Dict[str, Any], include_internal: bool = False) -> Dict[str, Any]:
+    # Callers always get a fresh top-level dict so the cached entry can't be rebound;
+    # nested analysis/post structures are shared with the cache and must be treated as read-only.
+    if include_internal:
+        return dict(result)
     return {
         "overall": result.get("overall") or {},
         "meta": result.get("meta") or {},
@@ -745,10 +937,7 @@ async def scan_multiple_subreddits(
     now = time.time()
     cached = _multi_scan_cache.get(cache_key)
     if cached and now - cached[0] < MULTI_SCAN_CACHE_TTL:
-        cached_result = cached[1]
-        if include_internal:
-            return cached_result
-        return _public_multi_scan_result(cached_result)
+        return _public_multi_scan_result(cached[1], include_internal=include_internal)
 
     posts = await fetch_posts_for_subreddits(
         normalized_subreddits,
@@ -783,6 +972,7 @@ async def scan_multiple_subreddits(
             posts_by_subreddit,
             game_name=game_name,
             keywords=keywords,
+            ranked=True,
         )
 
     result = {
@@ -799,8 +989,6 @@ async def scan_multiple_subreddits(
     }
 
     _multi_scan_cache[cache_key] = (now, result)
-    if include_internal:
-        return result
-    return _public_multi_scan_result(result)
+    return _public_multi_scan_result(result, include_internal=include_internal)
 
 
@@ -1,14 +1,32 @@
+import asyncio
+import heapq
 import math
-import json
 import re
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
 import httpx
+import orjson
+from pydantic_core import from_json
 
 ARCTIC_SHIFT_BASE = "https://arctic-shift.photon-reddit.com"
 
 
+ARCTIC_SHIFT_HEADERS = {
+    "User-Agent": "SentientTracker/1.0",
+    "Accept": "application/json",
+}
+
+
+ARCTIC_SHIFT_MAX_RESPONSE_BYTES = 8_000_000
+
+
+OPENAI_CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
+
+
 POST_FIELDS = "id,title,selftext,created_utc,score,num_comments,author,subreddit"
 
 
@@ -18,12 +36,36 @@ COMMENT_FIELDS = "id,body,created_utc,score,author,parent_id"
 CACHE_TTL = 600  # 10 minutes
 
 
+HISTORICAL_WINDOW_CACHE_TTL = 6 * 60 * 60  # 6 hours
+
+
 DISCOVERY_CACHE_TTL = 24 * 60 * 60  # 24 hours
 
 
 MULTI_SCAN_CACHE_TTL = 10 * 60  # 10 minutes
 
 
+STALE_CACHE_TTL = 6 * 60 * 60  # 6 hours; expired posts/comments served while Arctic Shift fails
+
+
+POST_CACHE_MAX_ENTRIES = 1024
+
+
+WINDOW_CACHE_MAX_ENTRIES = 1024
+
+
+COMMENTS_CACHE_MAX_ENTRIES = 4096
+
+
+DISCOVERY_CACHE_MAX_ENTRIES = 512
+
+
+MULTI_SCAN_CACHE_MAX_ENTRIES = 128
+
+
+SUBREDDIT_BREAKDOWN_CACHE_MAX_ENTRIES = 512
+
+
 WINDOWS: List[Tuple[str, str]] = [("48h", "0h"), ("8d", "48h"), ("30d", "8d")]
 
 
@@ -48,18 +90,33 @@ DISCOVERY_MAX_CANDIDATES = 30
 DISCOVERY_SAMPLE_POSTS = 25
 
 
+DISCOVERY_MULTI_WINDOW_LIMIT = 1000
+
+
 DISCOVERY_OPENAI_TOP = 10
 
 
+DISCOVERY_FETCH_CONCURRENCY = 8
+
+
 MAX_MULTI_SUBREDDITS = 5
 
 
 BREAKDOWN_MAX_POSTS_PER_SUBREDDIT = 8
 
 
+BREAKDOWN_AI_CONCURRENCY = 4
+
+
 BREAKDOWN_SELFTEXT_TRUNCATE = 220
 
 
+BREAKDOWN_BATCH_TOKENS_PER_SUBREDDIT = 700
+
+
+BREAKDOWN_BATCH_MAX_TOKENS = 4000
+
+
 TOP_POSTS_FOR_COMMENTS = 15
 
 
@@ -75,21 +132,131 @@ POST_SELFTEXT_TRUNCATE = 500
 COMMENT_FETCH_DELAY = 0.2
 
 
-_post_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+COMMENT_FETCH_CONCURRENCY = 4
+
+
+_SUBREDDIT_URL_RE = re.compile(r"reddit\.com/r/([^/?#]+)", re.IGNORECASE)
+_REDDIT_LINK_RE = re.compile(r"reddit\.com/comments/([a-z0-9_]+)", re.IGNORECASE)
+_NON_SUBREDDIT_CHAR_RE = re.compile(r"[^a-z0-9_]")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.IGNORECASE | re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_USER_MENTION_RE = re.compile(r"/?u/[A-Za-z0-9_-]+")
+
+
+class _TTLCache(OrderedDict):
+    """Bounded LRU map of ``key -> (timestamp, value)`` entries that expire after ``ttl`` seconds.
+
+    Expired entries are retained until ``stale_ttl`` so ``get_stale`` can fall back to them.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float = 0.0) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = max(ttl, stale_ttl)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        entry = super().get(key)
+        if entry is None:
+            return default
+        age = time.time() - entry[0]
+        if age >= self.ttl:
+            if age >= self.stale_ttl:
+                del self[key]
+            return default
+        self.move_to_end(key)
+        return entry
+
+    def get_stale(self, key: Any) -> Optional[Tuple[float, Any]]:
+        entry = super().get(key)
+        if entry is None or time.time() - entry[0] >= self.stale_ttl:
+            return None
+        return entry
+
+    def __setitem__(self, key: Any, value: Tuple[float, Any]) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+
+        # Drop expired entries from the cold end first, then evict least-recently-used ones.
+        now = time.time()
+        while self:
+            oldest_key = next(iter(self))
+            if now - super().__getitem__(oldest_key)[0] < self.stale_ttl:
+                break
+            self.popitem(last=False)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+_post_cache = _TTLCache(POST_CACHE_MAX_ENTRIES, CACHE_TTL, STALE_CACHE_TTL)
 
 
-_comments_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+# Live windows expire after CACHE_TTL at the call site; the cache itself keeps the historical TTL.
+_window_cache = _TTLCache(WINDOW_CACHE_MAX_ENTRIES, HISTORICAL_WINDOW_CACHE_TTL)
 
 
-_discovery_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+_comments_cache = _TTLCache(COMMENTS_CACHE_MAX_ENTRIES, CACHE_TTL, STALE_CACHE_TTL)
 
 
-_multi_scan_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_discovery_cache = _TTLCache(DISCOVERY_CACHE_MAX_ENTRIES, DISCOVERY_CACHE_TTL)
 
 
-_subreddit_breakdown_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_multi_scan_cache = _TTLCache(MULTI_SCAN_CACHE_MAX_ENTRIES, MULTI_SCAN_CACHE_TTL)
 
 
+_subreddit_breakdown_cache = _TTLCache(SUBREDDIT_BREAKDOWN_CACHE_MAX_ENTRIES, MULTI_SCAN_CACHE_TTL)
+
+
+# key -> [lock, holders]; entries are dropped once the last holder/waiter leaves.
+_cache_fill_locks: Dict[Tuple[str, Any], List[Any]] = {}
+
+
+@asynccontextmanager
+async def _cache_fill_lock(namespace: str, key: Any) -> AsyncIterator[None]:
+    # Concurrent misses on the same key queue here, so only the first one hits the network;
+    # callers re-check their cache once inside.
+    lock_key = (namespace, key)
+    entry = _cache_fill_locks.get(lock_key)
+    if entry is None:
+        entry = _cache_fill_locks[lock_key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            _cache_fill_locks.pop(lock_key, None)
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    # One pooled client keeps connections (and TLS sessions) alive across outbound calls.
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            follow_redirects=True,
+            # Idle connections outlive httpx's 5s default so back-to-back scans skip the handshake.
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0),
+            # Gathered Arctic Shift requests multiplex over one connection; httpx advertises
+            # gzip (and br, via the brotli extra) on its own.
+            http2=True,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+@lru_cache(maxsize=4096)
 def _normalize_subreddit(value: str) -> str:
     if not value:
         return ""
@@ -98,7 +265,7 @@ def _normalize_subreddit(value: str) -> str:
     if raw.lower().startswith("r/"):
         raw = raw[2:]
 
-    match = re.search(r"reddit\.com/r/([^/?#]+)", raw, re.IGNORECASE)
+    match = _SUBREDDIT_URL_RE.search(raw)
     if match:
         raw = match.group(1)
 
@@ -107,7 +274,7 @@ def _normalize_subreddit(value: str) -> str:
 
 def _extract_error_detail(resp: httpx.Response) -> str:
     try:
-        payload = resp.json()
+        payload = orjson.loads(resp.content)
         if isinstance(payload, dict):
             for key in ("error", "message", "detail"):
                 value = payload.get(key)
@@ -120,8 +287,55 @@ def _extract_error_detail(resp: httpx.Response) -> str:
         return text[:300] if text else ""
 
 
+async def _openai_chat_completion(api_key: str, payload: Dict[str, Any]) -> str:
+    text, _ = await _openai_chat_completion_with_finish_reason(api_key, payload)
+    return text
+
+
+async def _openai_chat_completion_with_finish_reason(
+    api_key: str,
+    payload: Dict[str, Any],
+) -> Tuple[str, str]:
+    client = _get_http_client()
+    resp = await client.post(
+        OPENAI_CHAT_COMPLETIONS_URL,
+        content=orjson.dumps(payload),
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        },
+    )
+
+    if resp.status_code != 200:
+        detail = _extract_error_detail(resp)
+        suffix = f": {detail}" if detail else ""
+        raise RuntimeError(f"OpenAI chat completion failed (HTTP {resp.status_code}){suffix}")
+
+    try:
+        data = orjson.loads(resp.content)
+    except orjson.JSONDecodeError as exc:
+        raise RuntimeError("Invalid JSON response from OpenAI chat completion") from exc
+
+    choices = data.get("choices") if isinstance(data, dict) else None
+    if not isinstance(choices, list) or not choices or not isinstance(choices[0], dict):
+        raise RuntimeError("Unexpected OpenAI chat completion response format")
+
+    message = choices[0].get("message") or {}
+    return str(message.get("content") or ""), str(choices[0].get("finish_reason") or "")
+
+
+@lru_cache(maxsize=8192)
+def _tokenize_cached(value: str) -> Tuple[str, ...]:
+    return tuple(_TOKEN_RE.findall(value.lower()))
+
+
+@lru_cache(maxsize=8192)
+def _token_set(value: str) -> FrozenSet[str]:
+    return frozenset(_tokenize_cached(value or ""))
+
+
 def _tokenize_text(value: str) -> List[str]:
-    return re.findall(r"[a-z0-9]+", (value or "").lower())
+    return list(_tokenize_cached(value or ""))
 
 
 def _normalize_game_lookup_key(game_name: str) -> str:
@@ -133,14 +347,13 @@ def _build_subreddit_prefixes(game_name: str) -> List[str]:
     if not tokens:
         return []
 
-    prefixes: List[str] = []
+    # Tokens are already lowercase [a-z0-9] runs, so every term built from them is a valid
+    # subreddit prefix; a dict keeps insertion order with O(1) dedup.
+    prefixes: Dict[str, None] = {}
 
     def _add(term: str) -> None:
-        cleaned = re.sub(r"[^a-z0-9_]", "", (term or "").lower())
-        if len(cleaned) < 2:
-            return
-        if cleaned not in prefixes:
-            prefixes.append(cleaned)
+        if len(term) >= 2:
+            prefixes.setdefault(term)
 
     # Prioritize high-signal forms and avoid short partial prefixes that introduce noisy matches.
     _add("".join(tokens))
@@ -159,7 +372,27 @@ def _build_subreddit_prefixes(game_name: str) -> List[str]:
         acronym = "".join(token[0] for token in tokens if token)
         _add(acronym)
 
-    return prefixes[:14]
+    return list(prefixes)[:14]
+
+
+def _collapse_subreddit_prefixes(prefixes: List[str]) -> Dict[str, int]:
+    # A prefix search for "elden" also returns "eldenring", so prefixes covered by a shorter one are
+    # folded into it. Very short prefixes (acronyms, "arc") match too many unrelated communities to
+    # stand in for a longer one. The value counts folded prefixes so callers can widen that search;
+    # a repeated prefix is the same search, so it is only counted once.
+    unique_prefixes = list(dict.fromkeys(prefixes))
+    covered_by: Dict[str, int] = {}
+    for prefix in sorted(unique_prefixes, key=len):
+        cover = next(
+            (kept for kept in covered_by if len(kept) >= 4 and prefix.startswith(kept)),
+            None,
+        )
+        if cover is None:
+            covered_by[prefix] = 1
+        else:
+            covered_by[cover] += 1
+
+    return {prefix: covered_by[prefix] for prefix in unique_prefixes if prefix in covered_by}
 
 
 def _extract_json_payload(text: str) -> Optional[Dict[str, Any]]:
@@ -168,35 +401,49 @@ def _extract_json_payload(text: str) -> Optional[Dict[str, Any]]:
         return None
 
     try:
-        parsed = json.loads(content)
+        parsed = orjson.loads(content)
         if isinstance(parsed, dict):
             return parsed
-    except Exception:
+    except orjson.JSONDecodeError:
         pass
 
-    fence_match = re.search(r"```(?:json)?\s*(.*?)\s*```", content, re.IGNORECASE | re.DOTALL)
+    fence_match = _JSON_FENCE_RE.search(content)
     if fence_match:
         fenced_body = fence_match.group(1).strip()
         try:
-            parsed = json.loads(fenced_body)
+            parsed = orjson.loads(fenced_body)
             if isinstance(parsed, dict):
                 return parsed
-        except Exception:
+        except orjson.JSONDecodeError:
             pass
 
-    object_match = re.search(r"\{.*\}", content, re.DOTALL)
+    object_match = _JSON_OBJECT_RE.search(content)
     if object_match:
         candidate = object_match.group(0)
         try:
-            parsed = json.loads(candidate)
+            parsed = orjson.loads(candidate)
             if isinstance(parsed, dict):
                 return parsed
-        except Exception:
+        except orjson.JSONDecodeError:
             pass
 
     return None
 
 
+def _extract_partial_json_payload(text: str) -> Optional[Dict[str, Any]]:
+    # For replies cut off at max_tokens: keep every complete value and drop the unfinished tail.
+    content = text or ""
+    start = content.find("{")
+    if start < 0:
+        return None
+
+    try:
+        parsed = from_json(content[start:], allow_partial=True)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) and parsed else None
+
+
 def _format_permalink(post_id: str) -> str:
     return f"https://www.reddit.com/comments/{post_id}/"
 
@@ -208,62 +455,65 @@ def _map_post(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 
     return {
         "id": str(post_id),
-        "title": item.get("title", "") or "",
-        "selftext": item.get("selftext", "") or "",
-        "created_utc": item.get("created_utc", 0) or 0,
-        "score": item.get("score", 0) or 0,
-        "num_comments": item.get("num_comments", 0) or 0,
-        "author": item.get("author", "") or "",
-        "subreddit": item.get("subreddit", "") or "",
+        "title": str(item.get("title") or ""),
+        "selftext": str(item.get("selftext") or ""),
+        "created_utc": float(item.get("created_utc") or 0.0),
+        "score": int(item.get("score") or 0),
+        "num_comments": int(item.get("num_comments") or 0),
+        "author": str(item.get("author") or "") or "unknown",
+        "subreddit": str(item.get("subreddit") or ""),
         "permalink": _format_permalink(str(post_id)),
     }
 
 
 def _apply_quality_filter(posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    filtered: List[Dict[str, Any]] = []
-
-    for post in posts:
-        num_comments = int(post.get("num_comments", 0) or 0)
-        score = int(post.get("score", 0) or 0)
-        selftext = str(post.get("selftext", "") or "")
-        title = str(post.get("title", "") or "")
-
-        is_low_quality = (
-            num_comments == 0
-            and score <= 1
-            and (len(selftext) == 0 or len(selftext) < 80)
-            and len(title) < 25
-        )
-
-        if not is_low_quality:
-            filtered.append(post)
-
-    return filtered
-
-
-def _calculate_post_rank(post: Dict[str, Any]) -> float:
-    score = max(0, int(post.get("score", 0) or 0))
-    num_comments = max(0, int(post.get("num_comments", 0) or 0))
-    selftext = str(post.get("selftext", "") or "")
-
+    # Posts arrive pre-typed from _map_post, so fields are read without re-coercion. A post is
+    # low quality only when it has no comments, score <= 1 and short selftext and title, so any
+    # one signal keeps it; the first match short-circuits the rest.
+    return [
+        post
+        for post in posts
+        if post["num_comments"] != 0
+        or post["score"] > 1
+        or len(post["selftext"]) >= 80
+        or len(post["title"]) >= 25
+    ]
+
+
+@lru_cache(maxsize=8192)
+def _rank_from_fields(score: int, num_comments: int, selftext_length: int) -> float:
     engagement = math.log(score + 1) + 2 * math.log(num_comments + 1)
-    text_bonus = min(len(selftext) / 500.0, 1.0)
+    text_bonus = min(selftext_length / 500.0, 1.0)
     rank = engagement + 0.35 * text_bonus
 
     # Small penalty for very low-signal posts with no discussion depth.
-    if num_comments == 0 and len(selftext) < 100:
+    if num_comments == 0 and selftext_length < 100:
         rank -= 0.25
 
     return rank
 
 
+def _calculate_post_rank(post: Dict[str, Any]) -> float:
+    # Rank depends only on these three ints, and a post is ranked by several passes per scan;
+    # memoising on them avoids the log calls without tagging the (persisted) post dict.
+    return _rank_from_fields(max(0, post["score"]), max(0, post["num_comments"]), len(post["selftext"]))
+
+
 def _apply_diversity_and_recency(posts: List[Dict[str, Any]], max_posts: int) -> List[Dict[str, Any]]:
     if not posts:
         return []
 
-    sorted_posts = sorted(posts, key=_calculate_post_rank, reverse=True)
+    # Only the head of the ranking is consumed; 3x headroom covers author/zero-comment skips.
+    head = heapq.nlargest(max_posts * 3, posts, key=_calculate_post_rank)
 
-    author_count: Dict[str, int] = {}
+    def _ranked_posts() -> Iterator[Dict[str, Any]]:
+        yield from head
+        if len(posts) > len(head):
+            # Only reached when the caps skipped most of the head; nlargest matches the sorted
+            # prefix, so the full ranking continues exactly where the head stopped.
+            yield from sorted(posts, key=_calculate_post_rank, reverse=True)[len(head):]
+
+    author_count: Dict[str, int] = defaultdict(int)
     zero_comment_count = 0
 
     now = time.time()
@@ -272,18 +522,19 @@ def _apply_diversity_and_recency(posts: List[Dict[str, Any]], max_posts: int) ->
 
     selected: List[Dict[str, Any]] = []
     deferred_recent: List[Dict[str, Any]] = []
+    # Indices of non-recent picks in rank order; the right end is the lowest-ranked one.
+    non_recent_slots: deque = deque()
     recent_count = 0
 
-    for post in sorted_posts:
+    for post in _ranked_posts():
         if len(selected) >= max_posts:
             break
 
-        author = str(post.get("author", "unknown") or "unknown")
-        num_comments = int(post.get("num_comments", 0) or 0)
-        created_utc = float(post.get("created_utc", 0) or 0)
-        is_recent = created_utc > three_days_ago
+        author = post["author"]
+        num_comments = post["num_comments"]
+        is_recent = post["created_utc"] > three_days_ago
 
-        if author_count.get(author, 0) >= MAX_POSTS_PER_AUTHOR:
+        if author_count[author] >= MAX_POSTS_PER_AUTHOR:
             if is_recent:
                 deferred_recent.append(post)
             continue
@@ -294,82 +545,82 @@ def _apply_diversity_and_recency(posts: List[Dict[str, Any]], max_posts: int) ->
             continue
 
         selected.append(post)
-        author_count[author] = author_count.get(author, 0) + 1
+        author_count[author] += 1
 
         if num_comments == 0:
             zero_comment_count += 1
         if is_recent:
             recent_count += 1
+        else:
+            non_recent_slots.append(len(selected) - 1)
 
     if recent_count < recent_target and deferred_recent:
-        deferred_recent.sort(key=lambda p: float(p.get("created_utc", 0) or 0), reverse=True)
-
-        for post in deferred_recent:
-            if recent_count >= recent_target:
-                break
+        # Each backfilled post raises recent_count, so only the newest shortfall-many are needed.
+        newest_deferred = heapq.nlargest(
+            recent_target - recent_count,
+            deferred_recent,
+            key=lambda p: p["created_utc"],
+        )
 
+        for post in newest_deferred:
             if len(selected) < max_posts:
                 selected.append(post)
-                recent_count += 1
-                continue
-
-            replace_index = -1
-            for idx in range(len(selected) - 1, -1, -1):
-                existing = selected[idx]
-                existing_recent = float(existing.get("created_utc", 0) or 0) > three_days_ago
-                if not existing_recent:
-                    replace_index = idx
-                    break
-
-            if replace_index >= 0:
-                selected[replace_index] = post
-                recent_count += 1
+            elif non_recent_slots:
+                selected[non_recent_slots.pop()] = post
+            else:
+                break
+            recent_count += 1
 
     return selected[:max_posts]
 
 
 def _clean_comment_body(body: str) -> str:
     clean = (body or "").strip()
-    clean = re.sub(r"/?u/[A-Za-z0-9_-]+", "[user]", clean)
+    # Every mention contains "u/", so most comments can skip the regex pass entirely.
+    if "u/" in clean:
+        clean = _USER_MENTION_RE.sub("[user]", clean)
     if len(clean) > COMMENT_BODY_TRUNCATE:
         clean = clean[:COMMENT_BODY_TRUNCATE] + "..."
     return clean
 
 
 def _select_best_comments(comments: List[Dict[str, Any]], max_count: int) -> List[Dict[str, Any]]:
-    sorted_comments = sorted(
-        comments,
-        key=lambda c: (
-            int(c.get("score", 0) or 0),
-            len(str(c.get("body", "") or "")),
-            float(c.get("created_utc", 0) or 0),
-        ),
-        reverse=True,
-    )
+    def _comment_key(c: Dict[str, Any]) -> Tuple[int, int, int]:
+        return (c["score"], len(c["body"]), c["created_utc"])
+
+    # 2x headroom leaves room for the per-author dedup below.
+    head = heapq.nlargest(max_count * 2, comments, key=_comment_key)
+
+    def _ranked_comments() -> Iterator[Dict[str, Any]]:
+        yield from head
+        if len(comments) > len(head):
+            # Only reached when author caps skipped most of the head; nlargest matches the
+            # sorted prefix, so the full ranking continues exactly where the head stopped.
+            yield from sorted(comments, key=_comment_key, reverse=True)[len(head):]
 
     selected: List[Dict[str, Any]] = []
-    author_counts: Dict[str, int] = {}
+    author_counts: Dict[str, int] = defaultdict(int)
 
-    for item in sorted_comments:
+    for item in _ranked_comments():
         if len(selected) >= max_count:
             break
 
-        author = str(item.get("author", "") or "").lower()
-        if author and author_counts.get(author, 0) >= 2:
+        author = item["author"].lower()
+        if author and author_counts[author] >= 2:
             continue
 
         selected.append(
             {
-                "id": str(item.get("id") or ""),
-                "body": _clean_comment_body(str(item.get("body", "") or "")),
-                "score": int(item.get("score", 0) or 0),
-                "created_utc": int(item.get("created_utc", 0) or 0),
-                "author": str(item.get("author", "") or ""),
+                "id": item["id"],
+                "body": _clean_comment_body(item["body"]),
+                "score": item["score"],
+                "created_utc": item["created_utc"],
+                "author": item["author"],
             }
         )
 
         if author:
-            author_counts[author] = author_counts.get(author, 0) + 1
+            author_counts[author] += 1
 
     return selected
 
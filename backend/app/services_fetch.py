@@ -1,59 +1,119 @@
 import asyncio
+import heapq
+import logging
 import math
 import os
-import re
 import time
-from typing import Any, Dict, List, Optional
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
 
 import httpx
+import orjson
 
 from .services_common import (
     ARCTIC_SHIFT_BASE,
+    ARCTIC_SHIFT_HEADERS,
+    ARCTIC_SHIFT_MAX_RESPONSE_BYTES,
     COMMENT_FIELDS,
+    COMMENT_FETCH_CONCURRENCY,
     COMMENT_FETCH_DELAY,
     CACHE_TTL,
     DISCOVERY_CACHE_TTL,
+    DISCOVERY_FETCH_CONCURRENCY,
     DISCOVERY_MAX_CANDIDATES,
     DISCOVERY_MAX_RESULTS,
+    DISCOVERY_MULTI_WINDOW_LIMIT,
     DISCOVERY_OPENAI_TOP,
     DISCOVERY_SAMPLE_POSTS,
+    HISTORICAL_WINDOW_CACHE_TTL,
     MAX_COMMENTS_PER_POST,
     MAX_POSTS_FINAL,
     TOP_POSTS_FOR_COMMENTS,
     POST_FIELDS,
     WINDOWS,
+    _NON_SUBREDDIT_CHAR_RE,
     _apply_diversity_and_recency,
     _apply_quality_filter,
+    _cache_fill_lock,
     _build_subreddit_prefixes,
     _calculate_post_rank,
+    _collapse_subreddit_prefixes,
     _comments_cache,
     _discovery_cache,
     _extract_error_detail,
-    _extract_json_payload,
+    _get_http_client,
     _map_post,
     _normalize_game_lookup_key,
     _normalize_subreddit,
+    _openai_chat_completion,
     _post_cache,
     _select_best_comments,
+    _token_set,
     _tokenize_text,
+    _window_cache,
 )
 
-async def _fetch_posts_window(normalized_subreddit: str, after: str, before: str) -> List[Dict[str, Any]]:
+logger = logging.getLogger(__name__)
+
+
+async def _arctic_shift_get(path: str, params: Dict[str, Any], timeout: float = 30.0) -> httpx.Response:
+    # Stream so an oversized body is rejected from its headers before any of it is buffered.
+    async with _get_http_client().stream(
+        "GET",
+        f"{ARCTIC_SHIFT_BASE}{path}",
+        params=params,
+        headers=ARCTIC_SHIFT_HEADERS,
+        timeout=timeout,
+    ) as resp:
+        declared_length = resp.headers.get("content-length", "")
+        if declared_length.isdigit() and int(declared_length) > ARCTIC_SHIFT_MAX_RESPONSE_BYTES:
+            raise RuntimeError(f"Arctic Shift response too large ({declared_length} bytes) for {path}")
+
+        # Chunked replies carry no length, and a gzip length counts compressed bytes, so the
+        # decoded body is also capped as it arrives.
+        chunks: List[bytes] = []
+        received = 0
+        async for chunk in resp.aiter_bytes():
+            received += len(chunk)
+            if received > ARCTIC_SHIFT_MAX_RESPONSE_BYTES:
+                raise RuntimeError(
+                    f"Arctic Shift response too large (over {ARCTIC_SHIFT_MAX_RESPONSE_BYTES} bytes) for {path}"
+                )
+            chunks.append(chunk)
+
+    # The body is already decoded, so the transfer headers no longer describe it.
+    headers = [
+        (name, value)
+        for name, value in resp.headers.multi_items()
+        if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+    ]
+    return httpx.Response(resp.status_code, headers=headers, content=b"".join(chunks), request=resp.request)
+
+
+def _window_cache_ttl(before: str) -> int:
+    # Windows that end in the past only drift as their posts age, so they can be held much
+    # longer than windows that still receive new posts.
+    return CACHE_TTL if before == "0h" else HISTORICAL_WINDOW_CACHE_TTL
+
+
+def _cached_posts_window(normalized_subreddit: str, after: str, before: str) -> Optional[List[Dict[str, Any]]]:
+    cached = _window_cache.get((normalized_subreddit.lower(), after, before))
+    if cached and time.time() - cached[0] < _window_cache_ttl(before):
+        return cached[1]
+    return None
+
+
+async def _request_posts_window(subreddit_param: str, after: str, before: str, limit: int) -> List[Dict[str, Any]]:
     params = {
-        "subreddit": normalized_subreddit,
+        "subreddit": subreddit_param,
         "after": after,
         "before": before,
         "sort": "desc",
-        "limit": 100,
+        "limit": limit,
         "fields": POST_FIELDS,
     }
-    headers = {
-        "User-Agent": "SentientTracker/1.0",
-        "Accept": "application/json",
-    }
-
-    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-        resp = await client.get(f"{ARCTIC_SHIFT_BASE}/api/posts/search", params=params, headers=headers)
+    resp = await _arctic_shift_get("/api/posts/search", params)
 
     if resp.status_code == 404:
         return []
@@ -64,8 +124,8 @@ async def _fetch_posts_window(normalized_subreddit: str, after: str, before: str
         raise RuntimeError(f"Arctic Shift posts request failed (HTTP {resp.status_code}){suffix}")
 
     try:
-        payload = resp.json()
-    except Exception as exc:
+        payload = orjson.loads(resp.content)
+    except orjson.JSONDecodeError as exc:
         raise RuntimeError("Invalid JSON response from Arctic Shift posts API") from exc
 
     rows = payload.get("data", []) if isinstance(payload, dict) else []
@@ -83,33 +143,184 @@ async def _fetch_posts_window(normalized_subreddit: str, after: str, before: str
     return mapped
 
 
+async def _fetch_posts_window(normalized_subreddit: str, after: str, before: str) -> List[Dict[str, Any]]:
+    cached = _cached_posts_window(normalized_subreddit, after, before)
+    if cached is not None:
+        return cached
+
+    now = time.time()
+    mapped = await _request_posts_window(normalized_subreddit, after, before, limit=100)
+    _window_cache[(normalized_subreddit.lower(), after, before)] = (now, mapped)
+    return mapped
+
+
+async def _fetch_posts_window_multi(
+    subreddits: List[str],
+    after: str,
+    before: str,
+) -> Dict[str, List[Dict[str, Any]]]:
+    # Arctic Shift accepts a plus-joined multi-subreddit filter, so one request covers every
+    # candidate; rows are bucketed back by their subreddit field.
+    rows = await _request_posts_window(
+        "+".join(subreddits), after, before, limit=DISCOVERY_MULTI_WINDOW_LIMIT
+    )
+    wanted = {subreddit.lower() for subreddit in subreddits}
+
+    buckets: Dict[str, List[Dict[str, Any]]] = {}
+    for post in rows:
+        key = post["subreddit"].lower()
+        if key not in wanted:
+            continue
+        bucket = buckets.setdefault(key, [])
+        if len(bucket) < DISCOVERY_SAMPLE_POSTS:
+            bucket.append(post)
+
+    if len(rows) >= DISCOVERY_MULTI_WINDOW_LIMIT:
+        # A full page is newest-first across every subreddit, so busy ones can crowd quieter
+        # ones out; a short bucket may be truncated rather than complete. Only full buckets are
+        # trusted, and the rest fall through to a single-subreddit fetch.
+        buckets = {key: bucket for key, bucket in buckets.items() if len(bucket) >= DISCOVERY_SAMPLE_POSTS}
+
+    return buckets
+
+
+async def _sample_posts_windows(
+    subreddits: List[str],
+    after: str,
+    before: str,
+) -> Dict[str, List[Dict[str, Any]]]:
+    samples: Dict[str, List[Dict[str, Any]]] = {}
+    missing: List[str] = []
+    for subreddit in subreddits:
+        cached = _cached_posts_window(subreddit, after, before)
+        if cached is not None:
+            samples[subreddit.lower()] = cached
+        else:
+            missing.append(subreddit)
+
+    if not missing:
+        return samples
+
+    now = time.time()
+    batched: Dict[str, List[Dict[str, Any]]] = {}
+    if len(missing) > 1:
+        try:
+            batched = await _fetch_posts_window_multi(missing, after, before)
+        except Exception as exc:
+            logger.warning("Batched subreddit sample fetch failed (%s-%s): %s", after, before, exc)
+
+    semaphore = asyncio.Semaphore(DISCOVERY_FETCH_CONCURRENCY)
+
+    async def _fetch_one(subreddit: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return await _fetch_posts_window(subreddit, after=after, before=before)
+            except Exception as exc:
+                logger.warning("Subreddit sample fetch failed (%s, %s-%s): %s", subreddit, after, before, exc)
+                return []
+
+    unbatched: List[str] = []
+    for subreddit in missing:
+        key = subreddit.lower()
+        posts = batched.get(key)
+        if posts:
+            _window_cache[(key, after, before)] = (now, posts)
+            samples[key] = posts
+        else:
+            # Not in the batch (rejected form, or crowded out or truncated by busier subreddits):
+            # fetch on its own.
+            unbatched.append(subreddit)
+
+    fetched = await asyncio.gather(*(_fetch_one(subreddit) for subreddit in unbatched))
+    for subreddit, posts in zip(unbatched, fetched):
+        samples[subreddit.lower()] = posts
+
+    return samples
+
+
 async def fetch_reddit_posts(subreddit: str, limit: int = 100) -> List[Dict[str, Any]]:
+    posts, _ = await fetch_reddit_posts_with_staleness(subreddit, limit=limit)
+    return posts
+
+
+async def fetch_reddit_posts_with_staleness(
+    subreddit: str,
+    limit: int = 100,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Return ``(posts, is_stale)``; ``is_stale`` is set when a failed refill fell back to expired posts."""
     normalized = _normalize_subreddit(subreddit)
     if not normalized:
-        return []
+        return [], False
 
-    now = time.time()
     cached = _post_cache.get(normalized)
-    if cached and now - cached[0] < CACHE_TTL:
-        return cached[1]
+    if cached and time.time() - cached[0] < CACHE_TTL:
+        return cached[1], False
 
+    async with _cache_fill_lock("posts", normalized):
+        cached = _post_cache.get(normalized)
+        if cached and time.time() - cached[0] < CACHE_TTL:
+            return cached[1], False
+        try:
+            return await _fetch_reddit_posts_uncached(normalized, limit), False
+        except Exception as exc:
+            stale = _post_cache.get_stale(normalized)
+            if stale is None:
+                raise
+            logger.warning(
+                "Arctic Shift posts fetch failed for r/%s; serving cached posts from %.0fs ago: %s",
+                normalized,
+                time.time() - stale[0],
+                exc,
+            )
+            return stale[1], True
+
+
+async def _fetch_reddit_posts_uncached(normalized: str, limit: int) -> List[Dict[str, Any]]:
+    now = time.time()
     target_limit = min(max(limit, 1), MAX_POSTS_FINAL)
     merged_by_id: Dict[str, Dict[str, Any]] = {}
     last_error: Optional[Exception] = None
 
-    for after, before in WINDOWS:
-        try:
-            window_posts = await _fetch_posts_window(normalized, after=after, before=before)
-        except Exception as exc:
-            last_error = exc
-            continue
-
+    def _merge(window_posts: List[Dict[str, Any]]) -> bool:
         for post in window_posts:
             merged_by_id[post["id"]] = post
+        # 2x headroom leaves the quality filter and the author/zero-comment caps in
+        # _apply_diversity_and_recency enough candidates to still fill target_limit.
+        return len(merged_by_id) >= target_limit * 2
 
-        # Once we have enough candidates for quality + diversity, stop requesting more windows.
-        if len(merged_by_id) >= target_limit * 2:
-            break
+    # The live window usually fills the headroom alone, so it is fetched first and the older
+    # windows cost no Arctic Shift traffic at all in that case.
+    live_after, live_before = WINDOWS[0]
+    try:
+        enough = _merge(await _fetch_posts_window(normalized, after=live_after, before=live_before))
+    except Exception as exc:
+        last_error = exc
+        enough = False
+
+    if not enough:
+        # Older windows are requested together so a deep fetch costs one more round trip, not
+        # one per window. They are folded newest-first; once the headroom is met, a window
+        # still in flight is cancelled.
+        tasks = [
+            asyncio.create_task(_fetch_posts_window(normalized, after=after, before=before))
+            for after, before in WINDOWS[1:]
+        ]
+        try:
+            for task in tasks:
+                try:
+                    window_posts = await task
+                except Exception as exc:
+                    last_error = exc
+                    continue
+                if _merge(window_posts):
+                    break
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Mark skipped failures as retrieved so they are not logged at garbage collection.
+                    task.exception()
 
     if not merged_by_id:
         if last_error is not None:
@@ -127,7 +338,7 @@ async def fetch_reddit_posts(subreddit: str, limit: int = 100) -> List[Dict[str,
 
 
 async def _search_subreddits_by_prefix(prefix: str, limit: int = 25) -> List[Dict[str, Any]]:
-    clean_prefix = re.sub(r"[^a-z0-9_]", "", (prefix or "").lower())
+    clean_prefix = _NON_SUBREDDIT_CHAR_RE.sub("", (prefix or "").lower())
     if len(clean_prefix) < 2:
         return []
 
@@ -135,13 +346,7 @@ async def _search_subreddits_by_prefix(prefix: str, limit: int = 25) -> List[Dic
         "subreddit_prefix": clean_prefix,
         "limit": max(1, min(limit, 1000)),
     }
-    headers = {
-        "User-Agent": "SentientTracker/1.0",
-        "Accept": "application/json",
-    }
-
-    async with httpx.AsyncClient(timeout=20.0, follow_redirects=True) as client:
-        resp = await client.get(f"{ARCTIC_SHIFT_BASE}/api/subreddits/search", params=params, headers=headers)
+    resp = await _arctic_shift_get("/api/subreddits/search", params, timeout=20.0)
 
     if resp.status_code in (400, 404):
         return []
@@ -152,8 +357,8 @@ async def _search_subreddits_by_prefix(prefix: str, limit: int = 25) -> List[Dic
         raise RuntimeError(f"Arctic Shift subreddit search failed (HTTP {resp.status_code}){suffix}")
 
     try:
-        payload = resp.json()
-    except Exception as exc:
+        payload = orjson.loads(resp.content)
+    except orjson.JSONDecodeError as exc:
         raise RuntimeError("Invalid JSON response from Arctic Shift subreddit search") from exc
 
     rows = payload.get("data", []) if isinstance(payload, dict) else []
@@ -201,37 +406,25 @@ def _extract_signal_tokens(game_name: str) -> List[str]:
     return signal_tokens or tokens
 
 
-def _name_similarity_score(game_tokens: List[str], candidate: Dict[str, Any]) -> float:
-    if not game_tokens:
+def _name_similarity_score(game_token_set: FrozenSet[str], candidate: Dict[str, Any]) -> float:
+    if not game_token_set:
         return 0.0
 
-    candidate_blob = " ".join(
-        [
-            str(candidate.get("subreddit", "") or ""),
-            str(candidate.get("title", "") or ""),
-            str(candidate.get("description", "") or ""),
-        ]
-    )
-    candidate_tokens = set(_tokenize_text(candidate_blob))
+    candidate_blob = f"{candidate['subreddit']} {candidate['title']} {candidate['description']}"
+    candidate_tokens = _token_set(candidate_blob)
     if not candidate_tokens:
         return 0.0
 
-    game_token_set = set(game_tokens)
     overlap = len(game_token_set.intersection(candidate_tokens))
     return overlap / float(len(game_token_set))
 
 
-def _content_relevance_score(game_tokens: List[str], posts: List[Dict[str, Any]]) -> float:
-    if not game_tokens or not posts:
+def _content_relevance_score(game_token_set: FrozenSet[str], posts: List[Dict[str, Any]]) -> float:
+    if not game_token_set or not posts:
         return 0.0
-    game_token_set = {token for token in game_tokens if len(token) >= 3}
-    if not game_token_set:
-        game_token_set = set(game_tokens)
     weighted_matches = 0.0
     for post in posts:
-        title = str(post.get("title", "") or "")
-        selftext = str(post.get("selftext", "") or "")[:260]
-        post_tokens = set(_tokenize_text(f"{title} {selftext}"))
+        post_tokens = _token_set(f"{post['title']} {post['selftext'][:260]}")
         overlap = post_tokens.intersection(game_token_set)
         if not overlap:
             continue
@@ -246,9 +439,9 @@ def _strict_name_match_score(game_name: str, candidate: Dict[str, Any]) -> float
     normalized_game = "".join(_tokenize_text(game_name))
     if not normalized_game:
         return 0.0
-    subreddit = "".join(_tokenize_text(str(candidate.get("subreddit", "") or "")))
-    title = "".join(_tokenize_text(str(candidate.get("title", "") or "")))
-    description = "".join(_tokenize_text(str(candidate.get("description", "") or "")))
+    subreddit = "".join(_tokenize_text(candidate["subreddit"]))
+    title = "".join(_tokenize_text(candidate["title"]))
+    description = "".join(_tokenize_text(candidate["description"]))
     if normalized_game and normalized_game == subreddit:
         return 1.0
     if normalized_game and normalized_game in subreddit:
@@ -298,14 +491,10 @@ async def _openai_rerank_subreddit_candidates(
         return []
 
     try:
-        import openai
-
-        openai.api_key = api_key
-
         lines: List[str] = []
         for index, candidate in enumerate(candidates, start=1):
-            subreddit = str(candidate.get("subreddit", "") or "")
-            subscribers = int(candidate.get("subscribers", 0) or 0)
+            subreddit = candidate["subreddit"]
+            subscribers = candidate["subscribers"]
             sample_titles = candidate.get("_sample_titles") or []
             if not isinstance(sample_titles, list):
                 sample_titles = []
@@ -325,18 +514,22 @@ async def _openai_rerank_subreddit_candidates(
             "\nChoose 3 to 5 subreddits. Prefer communities that are clearly about the game and have current discussion signal."
         )
 
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Return valid JSON only."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-            max_tokens=500,
+        text = await _openai_chat_completion(
+            api_key,
+            {
+                "model": "gpt-4o-mini",
+                "messages": [
+                    {"role": "system", "content": "Return valid JSON only."},
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": 0.2,
+                "max_tokens": 500,
+                "response_format": {"type": "json_object"},
+            },
         )
-        text = response.choices[0].message.content or ""
-        parsed = _extract_json_payload(text)
-        if not parsed:
+        # JSON mode guarantees a bare object, so the fenced/embedded fallbacks are not needed here.
+        parsed = orjson.loads(text)
+        if not isinstance(parsed, dict):
             return []
 
         picks = parsed.get("picks")
@@ -362,7 +555,7 @@ async def _openai_rerank_subreddit_candidates(
 
         return normalized
     except Exception as exc:
-        print(f"OpenAI subreddit rerank failed: {exc}")
+        logger.warning("OpenAI subreddit rerank failed: %s", exc)
         return []
 
 
@@ -419,8 +612,8 @@ def _apply_openai_rerank(
     ranked.sort(
         key=lambda item: (
             int(item.get("_ai_rank", 999)),
-            -float(item.get("score", 0.0)),
-            -int(item.get("subscribers", 0) or 0),
+            -item["score"],
+            -item["subscribers"],
         )
     )
 
@@ -435,55 +628,72 @@ def _apply_openai_rerank(
 async def discover_subreddits_for_game(
     game_name: str,
     max_results: int = 5,
-) -> List[Dict[str, Any]]:
+) -> List[Mapping[str, Any]]:
     lookup_key = _normalize_game_lookup_key(game_name)
     if not lookup_key:
         return []
     safe_max = max(1, min(max_results, DISCOVERY_MAX_RESULTS))
-    now = time.time()
     cached = _discovery_cache.get(lookup_key)
-    if cached and now - cached[0] < DISCOVERY_CACHE_TTL:
-        return [dict(item) for item in cached[1][:safe_max]]
-    prefixes = _build_subreddit_prefixes(game_name)
+    if cached and time.time() - cached[0] < DISCOVERY_CACHE_TTL:
+        return list(cached[1][:safe_max])
+
+    async with _cache_fill_lock("discovery", lookup_key):
+        cached = _discovery_cache.get(lookup_key)
+        if cached and time.time() - cached[0] < DISCOVERY_CACHE_TTL:
+            rows = cached[1]
+        else:
+            rows = await _discover_subreddits_uncached(game_name, lookup_key)
+    return list(rows[:safe_max])
+
+
+async def _discover_subreddits_uncached(game_name: str, lookup_key: str) -> List[Mapping[str, Any]]:
+    now = time.time()
+    prefixes = _collapse_subreddit_prefixes(_build_subreddit_prefixes(game_name))
     if not prefixes:
         _discovery_cache[lookup_key] = (now, [])
         return []
+    semaphore = asyncio.Semaphore(DISCOVERY_FETCH_CONCURRENCY)
+
+    async def _search_prefix(prefix: str, covered: int) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await _search_subreddits_by_prefix(prefix, limit=25 * covered)
+
+    prefix_items = list(prefixes.items())
+    prefix_results = await asyncio.gather(
+        *(_search_prefix(prefix, covered) for prefix, covered in prefix_items),
+        return_exceptions=True,
+    )
+    # Results are folded in prefix order, so ties resolve exactly as the sequential loop did.
     candidate_map: Dict[str, Dict[str, Any]] = {}
-    for prefix in prefixes:
-        try:
-            candidates = await _search_subreddits_by_prefix(prefix, limit=25)
-        except Exception as exc:
-            print(f"Subreddit discovery prefix failed ({prefix}): {exc}")
+    for (prefix, _), candidates in zip(prefix_items, prefix_results):
+        if isinstance(candidates, Exception):
+            logger.warning("Subreddit discovery prefix failed (%s): %s", prefix, candidates)
             continue
         for candidate in candidates:
-            subreddit = str(candidate.get("subreddit", "") or "").lower()
+            subreddit = candidate["subreddit"].lower()
             if not subreddit:
                 continue
             existing = candidate_map.get(subreddit)
             if existing is None:
                 candidate_map[subreddit] = candidate
                 continue
-            if int(candidate.get("subscribers", 0) or 0) > int(existing.get("subscribers", 0) or 0):
+            if candidate["subscribers"] > existing["subscribers"]:
                 candidate_map[subreddit] = candidate
     if not candidate_map:
         _discovery_cache[lookup_key] = (now, [])
         return []
-    game_tokens = _extract_signal_tokens(game_name)
+    # Signal tokens are already the >=3-char tokens when any exist, so one set serves both scores.
+    game_token_set = frozenset(_extract_signal_tokens(game_name))
     pre_scored: List[Dict[str, Any]] = []
     for candidate in candidate_map.values():
-        subreddit = str(candidate.get("subreddit", "") or "")
-        if not subreddit:
-            continue
-        name_score = _name_similarity_score(game_tokens, candidate)
+        name_score = _name_similarity_score(game_token_set, candidate)
         strict_match_score = _strict_name_match_score(game_name, candidate)
-        subscribers = int(candidate.get("subscribers", 0) or 0)
         # Relevance-first gate: avoid low-signal communities before activity weighting.
         if strict_match_score < 0.45 and name_score < 0.20:
             continue
         pre_scored.append(
             {
                 **candidate,
-                "subscribers": subscribers,
                 "_name_score": name_score,
                 "_strict_match_score": strict_match_score,
                 "_relevance_seed": (0.65 * strict_match_score) + (0.35 * name_score),
@@ -491,87 +701,84 @@ async def discover_subreddits_for_game(
         )
     # Fallback so discovery still returns candidates even when strict matching is sparse.
     if not pre_scored:
-        fallback = sorted(
+        fallback = heapq.nlargest(
+            max(6, min(DISCOVERY_MAX_CANDIDATES, 12)),
             candidate_map.values(),
-            key=lambda item: int(item.get("subscribers", 0) or 0),
-            reverse=True,
-        )[: max(6, min(DISCOVERY_MAX_CANDIDATES, 12))]
+            key=lambda item: item["subscribers"],
+        )
         for candidate in fallback:
-            name_score = _name_similarity_score(game_tokens, candidate)
+            name_score = _name_similarity_score(game_token_set, candidate)
             strict_match_score = _strict_name_match_score(game_name, candidate)
             pre_scored.append(
                 {
                     **candidate,
-                    "subscribers": int(candidate.get("subscribers", 0) or 0),
                     "_name_score": name_score,
                     "_strict_match_score": strict_match_score,
                     "_relevance_seed": (0.65 * strict_match_score) + (0.35 * name_score),
                 }
             )
-    ranked_candidates = sorted(
+    ranked_candidates = heapq.nlargest(
+        DISCOVERY_MAX_CANDIDATES,
         pre_scored,
-        key=lambda item: (
-            float(item.get("_relevance_seed", 0.0)),
-            int(item.get("subscribers", 0) or 0),
-        ),
-        reverse=True,
-    )[:DISCOVERY_MAX_CANDIDATES]
+        key=lambda item: (item["_relevance_seed"], item["subscribers"]),
+    )
+    # Small communities with weak name overlap rarely win on content, so skip their samples
+    # and let them score on subscribers/name alone.
+    sample_subreddits = [
+        candidate["subreddit"]
+        for candidate in ranked_candidates
+        if candidate["_name_score"] >= 0.20 or candidate["subscribers"] >= 5000
+    ]
+    recent_samples, baseline_samples = await asyncio.gather(
+        _sample_posts_windows(sample_subreddits, after="14d", before="0h"),
+        _sample_posts_windows(sample_subreddits, after="30d", before="14d"),
+    )
     scored: List[Dict[str, Any]] = []
     for candidate in ranked_candidates:
-        subreddit = str(candidate.get("subreddit", "") or "")
-        if not subreddit:
-            continue
-        recent_posts: List[Dict[str, Any]] = []
-        baseline_posts: List[Dict[str, Any]] = []
-        try:
-            recent_posts = await _fetch_posts_window(subreddit, after="14d", before="0h")
-        except Exception as exc:
-            print(f"Subreddit recent sample fetch failed ({subreddit}): {exc}")
-        try:
-            baseline_posts = await _fetch_posts_window(subreddit, after="30d", before="14d")
-        except Exception as exc:
-            print(f"Subreddit baseline sample fetch failed ({subreddit}): {exc}")
+        subreddit = candidate["subreddit"]
+        name_score = candidate["_name_score"]
+        strict_match_score = candidate["_strict_match_score"]
+        recent_posts = recent_samples.get(subreddit.lower(), [])
+        baseline_posts = baseline_samples.get(subreddit.lower(), [])
         recent_limit = max(1, int(DISCOVERY_SAMPLE_POSTS * 0.7))
         recent_posts = recent_posts[:recent_limit]
         remaining = max(DISCOVERY_SAMPLE_POSTS - len(recent_posts), 0)
         baseline_posts = baseline_posts[:remaining]
         sampled_posts = (recent_posts + baseline_posts)[:DISCOVERY_SAMPLE_POSTS]
-        total_comments = sum(int(post.get("num_comments", 0) or 0) for post in sampled_posts)
-        total_score = sum(int(post.get("score", 0) or 0) for post in sampled_posts)
+        total_comments = sum(post["num_comments"] for post in sampled_posts)
+        total_score = sum(post["score"] for post in sampled_posts)
         raw_activity = (
             math.log(1 + total_comments)
             + 0.4 * math.log(1 + total_score)
-            + 0.2 * math.log(1 + int(candidate.get("subscribers", 0) or 0))
+            + 0.2 * math.log(1 + candidate["subscribers"])
         )
-        name_score = float(candidate.get("_name_score", 0.0) or 0.0)
-        strict_match_score = float(candidate.get("_strict_match_score", 0.0) or 0.0)
-        content_score = _content_relevance_score(game_tokens, sampled_posts)
+        content_score = _content_relevance_score(game_token_set, sampled_posts)
         titles_source = recent_posts if recent_posts else sampled_posts
         scored.append(
             {
                 "subreddit": subreddit,
-                "subscribers": int(candidate.get("subscribers", 0) or 0),
+                "subscribers": candidate["subscribers"],
                 "score": 0.0,
                 "reason": "",
                 "_name_score": name_score,
                 "_strict_match_score": strict_match_score,
                 "_content_score": content_score,
                 "_raw_activity": raw_activity,
-                "_sample_titles": [str(post.get("title", "") or "") for post in titles_source[:3]],
+                "_sample_titles": [post["title"] for post in titles_source[:3]],
             }
         )
     if not scored:
         _discovery_cache[lookup_key] = (now, [])
         return []
-    activity_values = [float(item.get("_raw_activity", 0.0) or 0.0) for item in scored]
+    activity_values = [item["_raw_activity"] for item in scored]
     activity_low = min(activity_values) if activity_values else 0.0
     activity_high = max(activity_values) if activity_values else 0.0
     for item in scored:
-        content_score = float(item.get("_content_score", 0.0) or 0.0)
-        name_score = float(item.get("_name_score", 0.0) or 0.0)
-        strict_match_score = float(item.get("_strict_match_score", 0.0) or 0.0)
+        content_score = item["_content_score"]
+        name_score = item["_name_score"]
+        strict_match_score = item["_strict_match_score"]
         activity_score = _normalize_activity_score(
-            float(item.get("_raw_activity", 0.0) or 0.0),
+            item["_raw_activity"],
             activity_low,
             activity_high,
         )
@@ -592,24 +799,27 @@ async def discover_subreddits_for_game(
         )
     deterministic = sorted(
         scored,
-        key=lambda item: (float(item.get("score", 0.0)), int(item.get("subscribers", 0) or 0)),
+        key=lambda item: (item["score"], item["subscribers"]),
         reverse=True,
     )
     rerank_candidates = deterministic[:DISCOVERY_OPENAI_TOP]
     picks = await _openai_rerank_subreddit_candidates(game_name, rerank_candidates)
     reranked = _apply_openai_rerank(deterministic, picks) if picks else deterministic
-    cached_rows: List[Dict[str, Any]] = []
+    # Rows are shared between every caller of a cached lookup, so they are handed out read-only.
+    cached_rows: List[Mapping[str, Any]] = []
     for item in reranked[:DISCOVERY_MAX_RESULTS]:
         cached_rows.append(
-            {
-                "subreddit": str(item.get("subreddit", "") or ""),
-                "subscribers": int(item.get("subscribers", 0) or 0),
-                "score": float(item.get("score", 0.0) or 0.0),
-                "reason": str(item.get("reason", "") or ""),
-            }
+            MappingProxyType(
+                {
+                    "subreddit": item["subreddit"],
+                    "subscribers": item["subscribers"],
+                    "score": item["score"],
+                    "reason": item["reason"],
+                }
+            )
         )
     _discovery_cache[lookup_key] = (now, cached_rows)
-    return [dict(item) for item in cached_rows[:safe_max]]
+    return cached_rows
 
 async def fetch_posts_for_subreddits(
     subreddits: List[str],
@@ -640,54 +850,78 @@ async def fetch_posts_for_subreddits(
     tasks = [fetch_reddit_posts(subreddit, limit=safe_per_sub_limit) for subreddit in unique_subreddits]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
-    merged_by_id: Dict[str, Dict[str, Any]] = {}
+    # Rank each post once; duplicates across subreddits keep the higher-ranked copy.
+    ranked_by_id: Dict[str, Tuple[float, Dict[str, Any]]] = {}
     for result in results:
         if isinstance(result, Exception):
             continue
 
         for post in result:
-            post_id = str(post.get("id") or "")
-            if not post_id:
-                continue
+            post_id = post["id"]
+            rank = _calculate_post_rank(post)
+            existing = ranked_by_id.get(post_id)
+            if existing is None or rank > existing[0]:
+                ranked_by_id[post_id] = (rank, post)
 
-            existing = merged_by_id.get(post_id)
-            if existing is None:
-                merged_by_id[post_id] = post
-                continue
+    if not ranked_by_id:
+        return []
 
-            if _calculate_post_rank(post) > _calculate_post_rank(existing):
-                merged_by_id[post_id] = post
+    top = heapq.nlargest(safe_total_limit, ranked_by_id.values(), key=itemgetter(0))
+    return [post for _, post in top]
 
-    if not merged_by_id:
-        return []
 
-    ranked_posts = sorted(merged_by_id.values(), key=_calculate_post_rank, reverse=True)
-    return ranked_posts[:safe_total_limit]
+def _cached_comments(post_id: str) -> Optional[List[Dict[str, Any]]]:
+    cached = _comments_cache.get(post_id)
+    if cached and time.time() - cached[0] < CACHE_TTL:
+        return cached[1]
+    return None
 
 
 async def fetch_comments_for_post(post_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-    if not post_id:
-        return []
+    comments, _ = await fetch_comments_for_post_with_staleness(post_id, limit=limit)
+    return comments
 
-    now = time.time()
-    cached = _comments_cache.get(post_id)
-    if cached and now - cached[0] < CACHE_TTL:
-        cached_comments = cached[1]
-        return _select_best_comments(cached_comments, max_count=min(max(limit, 1), 100))
 
+async def fetch_comments_for_post_with_staleness(
+    post_id: str,
+    limit: int = 50,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Return ``(comments, is_stale)``; ``is_stale`` is set when a failed refill fell back to expired comments."""
+    if not post_id:
+        return [], False
+
+    is_stale = False
+    cached_comments = _cached_comments(post_id)
+    if cached_comments is None:
+        async with _cache_fill_lock("comments", post_id):
+            cached_comments = _cached_comments(post_id)
+            if cached_comments is None:
+                try:
+                    cached_comments = await _fetch_comments_uncached(post_id)
+                except Exception as exc:
+                    stale = _comments_cache.get_stale(post_id)
+                    if stale is None:
+                        raise
+                    logger.warning(
+                        "Arctic Shift comments fetch failed for %s; serving cached comments: %s",
+                        post_id,
+                        exc,
+                    )
+                    cached_comments = stale[1]
+                    is_stale = True
+
+    return _select_best_comments(cached_comments, max_count=min(max(limit, 1), 100)), is_stale
+
+
+async def _fetch_comments_uncached(post_id: str) -> List[Dict[str, Any]]:
+    now = time.time()
     params = {
         "link_id": f"t3_{post_id}",
         "sort": "desc",
         "limit": 100,
         "fields": COMMENT_FIELDS,
     }
-    headers = {
-        "User-Agent": "SentientTracker/1.0",
-        "Accept": "application/json",
-    }
-
-    async with httpx.AsyncClient(timeout=20.0, follow_redirects=True) as client:
-        resp = await client.get(f"{ARCTIC_SHIFT_BASE}/api/comments/search", params=params, headers=headers)
+    resp = await _arctic_shift_get("/api/comments/search", params, timeout=20.0)
 
     if resp.status_code in (404, 400):
         _comments_cache[post_id] = (now, [])
@@ -699,8 +933,8 @@ async def fetch_comments_for_post(post_id: str, limit: int = 50) -> List[Dict[st
         raise RuntimeError(f"Arctic Shift comments request failed (HTTP {resp.status_code}){suffix}")
 
     try:
-        data = resp.json()
-    except Exception as exc:
+        data = orjson.loads(resp.content)
+    except orjson.JSONDecodeError as exc:
         raise RuntimeError("Invalid JSON response from Arctic Shift comments API") from exc
 
     raw_comments = data.get("data", []) if isinstance(data, dict) else []
@@ -731,7 +965,7 @@ async def fetch_comments_for_post(post_id: str, limit: int = 50) -> List[Dict[st
         )
 
     _comments_cache[post_id] = (now, comments)
-    return _select_best_comments(comments, max_count=min(max(limit, 1), 100))
+    return comments
 
 
 async def sample_comments_for_posts(
@@ -742,26 +976,34 @@ async def sample_comments_for_posts(
     if not posts:
         return []
 
-    ranked_posts = sorted(posts, key=_calculate_post_rank, reverse=True)[: max(max_posts, 1)]
-    sampled: List[Dict[str, Any]] = []
+    ranked_posts = heapq.nlargest(max(max_posts, 1), posts, key=_calculate_post_rank)
+    post_ids = [post["id"] for post in ranked_posts if post["id"]]
 
-    for post in ranked_posts:
-        post_id = str(post.get("id") or "")
-        if not post_id:
-            continue
+    # A few fetches run at once; each slot still pauses between requests to stay within the rate budget.
+    semaphore = asyncio.Semaphore(COMMENT_FETCH_CONCURRENCY)
 
-        try:
-            comments = await fetch_comments_for_post(post_id, limit=max(max_comments_per_post, 1))
-        except Exception:
-            comments = []
+    async def _fetch_one(post_id: str) -> List[Dict[str, Any]]:
+        # Cache hits never reach Arctic Shift, so they skip both the slot and the pause.
+        if _cached_comments(post_id) is not None:
+            return await fetch_comments_for_post(post_id, limit=max(max_comments_per_post, 1))
+
+        async with semaphore:
+            try:
+                comments = await fetch_comments_for_post(post_id, limit=max(max_comments_per_post, 1))
+            except Exception:
+                comments = []
+            await asyncio.sleep(COMMENT_FETCH_DELAY)
+            return comments
 
+    results = await asyncio.gather(*[_fetch_one(post_id) for post_id in post_ids])
+
+    sampled: List[Dict[str, Any]] = []
+    for post_id, comments in zip(post_ids, results):
         for comment in comments:
             item = dict(comment)
             item["source_post_id"] = post_id
             sampled.append(item)
 
-        await asyncio.sleep(COMMENT_FETCH_DELAY)
-
     return sampled
 
 
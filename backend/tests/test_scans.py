@@ -23,7 +23,7 @@ def test_scan_endpoint(client, monkeypatch):
     headers = {"Authorization": f"Bearer {token}"}
 
     async def fake_fetch_posts(subreddit, limit=100):
-        return [{"id": "1", "title": "post1", "score": 10, "num_comments": 2, "selftext": "content"}]
+        return [{"id": "1", "title": "post1", "score": 10, "num_comments": 2, "selftext": "content"}], False
 
     async def fake_sample_comments(posts, max_posts=15, max_comments_per_post=10):
         return [{"body": "comment", "source_post_id": "1"}]
@@ -31,7 +31,7 @@ def test_scan_endpoint(client, monkeypatch):
     async def fake_analyze(posts, comments, game_name="", keywords=""):
         return {"sentiment_label": "Positive", "themes": [], "pain_points": [], "wins": []}
 
-    monkeypatch.setattr(services, "fetch_reddit_posts", fake_fetch_posts)
+    monkeypatch.setattr(services, "fetch_reddit_posts_with_staleness", fake_fetch_posts)
     monkeypatch.setattr(services, "sample_comments_for_posts", fake_sample_comments)
     monkeypatch.setattr(services, "analyze_posts_with_ai", fake_analyze)
 
@@ -50,6 +50,8 @@ def test_scan_endpoint(client, monkeypatch):
     stored = _run_async(database.db.scan_results.find_one({"_id": data["result_id"]}))
     assert stored is not None
     assert stored.get("user_id") == me["user_id"]
+    assert stored["meta"] == {"stale_posts": False}
+    assert data["stale_posts"] is False
 
     # verify results stored
     r = client.get(f"/api/games/{gid}/latest-result", headers=headers)
@@ -146,7 +148,7 @@ def test_latest_result_is_user_scoped(client, monkeypatch):
     other_me = client.get("/api/auth/me", headers=other_headers).json()
 
     async def fake_fetch_posts(subreddit, limit=100):
-        return [{"id": "1", "title": "owner-post", "score": 10, "num_comments": 2, "selftext": "content"}]
+        return [{"id": "1", "title": "owner-post", "score": 10, "num_comments": 2, "selftext": "content"}], False
 
     async def fake_sample_comments(posts, max_posts=15, max_comments_per_post=10):
         return [{"body": "comment", "source_post_id": "1"}]
@@ -154,7 +156,7 @@ def test_latest_result_is_user_scoped(client, monkeypatch):
     async def fake_analyze(posts, comments, game_name="", keywords=""):
         return {"sentiment_label": "Positive", "themes": [], "pain_points": [], "wins": []}
 
-    monkeypatch.setattr(services, "fetch_reddit_posts", fake_fetch_posts)
+    monkeypatch.setattr(services, "fetch_reddit_posts_with_staleness", fake_fetch_posts)
     monkeypatch.setattr(services, "sample_comments_for_posts", fake_sample_comments)
     monkeypatch.setattr(services, "analyze_posts_with_ai", fake_analyze)
 
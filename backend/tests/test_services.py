@@ -0,0 +1,627 @@
+import asyncio
+import gc
+import gzip
+
+import httpx
+import orjson
+import pytest
+
+from app import services_analysis, services_breakdown, services_common, services_fetch
+
+
+def _run_async(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coro)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+@pytest.fixture(autouse=True)
+def _clean_service_state():
+    caches = (
+        services_common._post_cache,
+        services_common._window_cache,
+        services_common._comments_cache,
+        services_common._discovery_cache,
+        services_common._multi_scan_cache,
+        services_common._subreddit_breakdown_cache,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+def _install_transport(monkeypatch, handler):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(services_common, "_http_client", client)
+    return client
+
+
+def _raw_post(post_id, subreddit, **overrides):
+    row = {
+        "id": post_id,
+        "title": f"Post {post_id} about the game",
+        "selftext": "",
+        "created_utc": 1_700_000_000,
+        "score": 5,
+        "num_comments": 3,
+        "author": f"author_{post_id}",
+        "subreddit": subreddit,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_sample_windows_refetches_subreddits_crowded_out_of_a_full_batch(monkeypatch):
+    requested = []
+
+    def handler(request):
+        subreddit = request.url.params["subreddit"]
+        requested.append(subreddit)
+        if "+" in subreddit:
+            # A full page dominated by the busy subreddit leaves the quiet one truncated.
+            rows = [_raw_post(f"b{i}", "busy") for i in range(services_common.DISCOVERY_MULTI_WINDOW_LIMIT - 10)]
+            rows += [_raw_post(f"q{i}", "quiet") for i in range(10)]
+        else:
+            rows = [_raw_post(f"q{i}", "quiet") for i in range(30)]
+        return httpx.Response(200, content=orjson.dumps({"data": rows}))
+
+    _install_transport(monkeypatch, handler)
+
+    samples = _run_async(services_fetch._sample_posts_windows(["busy", "quiet"], after="14d", before="0h"))
+
+    assert requested == ["busy+quiet", "quiet"]
+    assert len(samples["busy"]) == services_common.DISCOVERY_SAMPLE_POSTS
+    assert len(samples["quiet"]) == 30
+    # The truncated batch bucket must not be cached in place of the complete single fetch.
+    assert len(services_fetch._cached_posts_window("quiet", "14d", "0h")) == 30
+
+
+def test_sample_windows_trusts_short_buckets_from_a_partial_batch(monkeypatch):
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.params["subreddit"])
+        rows = [_raw_post(f"b{i}", "busy") for i in range(40)]
+        rows += [_raw_post(f"q{i}", "quiet") for i in range(3)]
+        return httpx.Response(200, content=orjson.dumps({"data": rows}))
+
+    _install_transport(monkeypatch, handler)
+
+    samples = _run_async(services_fetch._sample_posts_windows(["busy", "quiet"], after="14d", before="0h"))
+
+    assert requested == ["busy+quiet"]
+    assert len(samples["quiet"]) == 3
+
+
+def _window_handler(rows_by_window, requested=None):
+    def handler(request):
+        after = request.url.params["after"]
+        if requested is not None:
+            requested.append(after)
+        rows = rows_by_window.get(after, [])
+        return httpx.Response(200, content=orjson.dumps({"data": rows}))
+
+    return handler
+
+
+def test_fetch_posts_keeps_headroom_when_one_author_dominates_the_first_window(monkeypatch):
+    # Every live post passes the quality filter but shares one author, so the per-author cap
+    # only keeps a few of them; the older window has to be fetched to fill the limit.
+    rows_by_window = {
+        "48h": [_raw_post(f"a{i}", "crowded", author="prolific") for i in range(10)],
+        "8d": [_raw_post(f"b{i}", "crowded") for i in range(15)],
+    }
+    _install_transport(monkeypatch, _window_handler(rows_by_window))
+
+    posts = _run_async(services_fetch.fetch_reddit_posts("crowded", limit=10))
+
+    assert len(posts) == 10
+    assert sum(1 for post in posts if post["author"] == "prolific") == services_common.MAX_POSTS_PER_AUTHOR
+
+
+def test_fetch_posts_only_requests_the_live_window_when_it_fills_the_headroom(monkeypatch):
+    requested = []
+    rows_by_window = {"48h": [_raw_post(f"a{i}", "busy") for i in range(25)]}
+    _install_transport(monkeypatch, _window_handler(rows_by_window, requested))
+
+    posts = _run_async(services_fetch.fetch_reddit_posts("busy", limit=10))
+
+    assert len(posts) == 10
+    assert requested == ["48h"]
+
+
+def _mapped_posts(prefix, count):
+    return [services_common._map_post(_raw_post(f"{prefix}{i}", "deep")) for i in range(count)]
+
+
+def _run_deep_fetch(monkeypatch, oldest_window):
+    events = []
+
+    async def fake_window(normalized_subreddit, after, before):
+        events.append(("start", after))
+        if after == "48h":
+            return _mapped_posts("a", 5)
+        if after == "8d":
+            await asyncio.sleep(0.01)
+            return _mapped_posts("b", 20)
+        return await oldest_window(events)
+
+    monkeypatch.setattr(services_fetch, "_fetch_posts_window", fake_window)
+
+    async def scenario():
+        unhandled = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+        posts = await services_fetch._fetch_reddit_posts_uncached("deep", 10)
+        await asyncio.sleep(0)
+        gc.collect()
+        return posts, unhandled
+
+    posts, unhandled = _run_async(scenario())
+    return posts, unhandled, events
+
+
+def test_fetch_posts_cancels_an_older_window_still_in_flight(monkeypatch):
+    async def slow_oldest(events):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append(("cancelled", "30d"))
+            raise
+        return []
+
+    posts, unhandled, events = _run_deep_fetch(monkeypatch, slow_oldest)
+
+    assert len(posts) == 10
+    assert events == [("start", "48h"), ("start", "8d"), ("start", "30d"), ("cancelled", "30d")]
+    assert unhandled == []
+
+
+def test_fetch_posts_retrieves_the_failure_of_a_skipped_window(monkeypatch):
+    async def failing_oldest(events):
+        raise RuntimeError("Arctic Shift unavailable")
+
+    posts, unhandled, events = _run_deep_fetch(monkeypatch, failing_oldest)
+
+    assert len(posts) == 10
+    assert ("start", "30d") in events
+    assert unhandled == []
+
+
+def _subreddit_posts(subreddit, count=6):
+    return [
+        services_common._map_post(_raw_post(f"{subreddit[:3]}{i}x", subreddit, score=10 + i))
+        for i in range(count)
+    ]
+
+
+def _insight(text, post_id):
+    return {"text": text, "evidence": [f"https://www.reddit.com/comments/{post_id}/"]}
+
+
+def _valid_analysis(label, posts):
+    post_id = posts[0]["id"]
+    return {
+        "sentiment_label": label,
+        "sentiment_summary": f"Players are {label.lower()} overall.",
+        "themes": ["Combat", "Progression", "Performance"],
+        "pain_points": [_insight(f"pain {i}", post_id) for i in range(3)],
+        "wins": [_insight(f"win {i}", post_id) for i in range(3)],
+    }
+
+
+def _breakdown_row(subreddit, posts, label="Positive"):
+    post_id = posts[0]["id"]
+    return {
+        "subreddit": subreddit,
+        "sentiment_label": label,
+        "summary_bullets": [f"{subreddit} is {label.lower()}.", "Second point.", "Third point."],
+        "top_themes": ["Combat", "Progression", "Performance"],
+        "top_pain_points": [_insight(f"pain {i}", post_id) for i in range(3)],
+        "top_wins": [_insight(f"win {i}", post_id) for i in range(3)],
+    }
+
+
+def _install_batched_reply(monkeypatch, text, finish_reason="stop"):
+    state = {"payloads": [], "repairs": 0}
+
+    async def fake_chat(api_key, payload):
+        state["payloads"].append(payload)
+        return text, finish_reason
+
+    async def fake_repair(raw_text, schema_hint):
+        state["repairs"] += 1
+        return None
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(services_breakdown, "_openai_chat_completion_with_finish_reason", fake_chat)
+    monkeypatch.setattr(services_breakdown, "_repair_json_payload_with_ai", fake_repair)
+    return state
+
+
+def test_batched_breakdown_matches_rows_to_requested_subreddits(monkeypatch):
+    posts_by_subreddit = {"Alpha": _subreddit_posts("Alpha"), "beta": _subreddit_posts("beta")}
+    rows = [
+        _breakdown_row("r/alpha", posts_by_subreddit["Alpha"]),
+        _breakdown_row("r/alpha", posts_by_subreddit["Alpha"], label="Negative"),
+        _breakdown_row("gamma", posts_by_subreddit["beta"]),
+        _breakdown_row("BETA", posts_by_subreddit["beta"], label="Negative"),
+    ]
+    state = _install_batched_reply(monkeypatch, orjson.dumps({"breakdown": rows}).decode())
+
+    analyses = _run_async(services_breakdown.analyze_subreddits_batched_with_ai(posts_by_subreddit, game_name="Game"))
+
+    assert set(analyses) == {"Alpha", "beta"}
+    assert analyses["Alpha"]["sentiment_label"] == "Positive"
+    assert analyses["beta"]["sentiment_label"] == "Negative"
+    assert state["repairs"] == 0
+
+
+def test_batched_breakdown_caps_the_token_budget(monkeypatch):
+    posts_by_subreddit = {f"sub{i}": _subreddit_posts(f"sub{i}") for i in range(12)}
+    state = _install_batched_reply(monkeypatch, orjson.dumps({"breakdown": []}).decode())
+
+    _run_async(services_breakdown.analyze_subreddits_batched_with_ai(posts_by_subreddit, game_name="Game"))
+
+    assert state["payloads"][0]["max_tokens"] == services_common.BREAKDOWN_BATCH_MAX_TOKENS
+
+
+def test_batched_breakdown_salvages_a_truncated_reply_without_repair(monkeypatch):
+    posts_by_subreddit = {"alpha": _subreddit_posts("alpha"), "beta": _subreddit_posts("beta")}
+    rows = [_breakdown_row("alpha", posts_by_subreddit["alpha"]), _breakdown_row("beta", posts_by_subreddit["beta"])]
+    full_text = orjson.dumps({"breakdown": rows}).decode()
+    # Cut the reply off inside the second row's pain points.
+    truncated = full_text[: full_text.index("pain 1", full_text.index('"beta"'))]
+    state = _install_batched_reply(monkeypatch, truncated, finish_reason="length")
+
+    analyses = _run_async(services_breakdown.analyze_subreddits_batched_with_ai(posts_by_subreddit, game_name="Game"))
+
+    assert set(analyses) == {"alpha"}
+    assert state["repairs"] == 0
+
+
+def test_batched_breakdown_returns_nothing_when_repair_fails(monkeypatch):
+    posts_by_subreddit = {"alpha": _subreddit_posts("alpha"), "beta": _subreddit_posts("beta")}
+    state = _install_batched_reply(monkeypatch, "Sorry, I cannot help with that.")
+
+    analyses = _run_async(services_breakdown.analyze_subreddits_batched_with_ai(posts_by_subreddit, game_name="Game"))
+
+    assert analyses == {}
+    assert state["repairs"] == 1
+
+
+def _install_single_breakdown(monkeypatch):
+    analysed = []
+
+    async def fake_single(posts, comments, subreddit_name, game_name="", keywords=""):
+        analysed.append(subreddit_name)
+        return _valid_analysis("Negative", posts)
+
+    async def fake_comments(posts, max_posts=15, max_comments_per_post=10):
+        return []
+
+    monkeypatch.setattr(services_breakdown, "analyze_subreddit_with_ai", fake_single)
+    monkeypatch.setattr(services_breakdown, "sample_comments_for_posts", fake_comments)
+    return analysed
+
+
+def test_breakdown_falls_back_per_subreddit_for_missing_or_invalid_batched_rows(monkeypatch):
+    posts_by_subreddit = {
+        "alpha": _subreddit_posts("alpha"),
+        "beta": _subreddit_posts("beta"),
+        "gamma": _subreddit_posts("gamma"),
+    }
+    invalid_beta = {"subreddit": "beta", "sentiment_label": "Mixed", "summary_bullets": ["Thin."], "top_themes": ["One"]}
+    rows = [_breakdown_row("alpha", posts_by_subreddit["alpha"]), invalid_beta]
+    _install_batched_reply(monkeypatch, orjson.dumps({"breakdown": rows}).decode())
+    analysed = _install_single_breakdown(monkeypatch)
+
+    result = _run_async(services_breakdown.analyze_subreddit_breakdown_with_ai(posts_by_subreddit, "Game"))
+
+    assert sorted(analysed) == ["beta", "gamma"]
+    labels = {row["subreddit"]: row["sentiment_label"] for row in result["breakdown"]}
+    assert labels == {"alpha": "Positive", "beta": "Negative", "gamma": "Negative"}
+
+
+def test_breakdown_falls_back_per_subreddit_when_batched_repair_fails(monkeypatch):
+    posts_by_subreddit = {"alpha": _subreddit_posts("alpha"), "beta": _subreddit_posts("beta")}
+    state = _install_batched_reply(monkeypatch, "not json at all")
+    analysed = _install_single_breakdown(monkeypatch)
+
+    result = _run_async(services_breakdown.analyze_subreddit_breakdown_with_ai(posts_by_subreddit, "Game"))
+
+    assert state["repairs"] == 1
+    assert sorted(analysed) == ["alpha", "beta"]
+    assert [row["subreddit"] for row in result["breakdown"]] == ["alpha", "beta"]
+
+
+def test_batched_breakdown_prompt_includes_comment_samples_and_caches_per_subreddit(monkeypatch):
+    posts_by_subreddit = {"alpha": _subreddit_posts("alpha"), "beta": _subreddit_posts("beta")}
+    state = _install_batched_reply(
+        monkeypatch,
+        orjson.dumps({"breakdown": [_breakdown_row("alpha", posts_by_subreddit["alpha"])]}).decode(),
+    )
+    sampled = []
+    analysed = []
+
+    async def fake_comments(posts, max_posts=15, max_comments_per_post=10):
+        subreddit = posts[0]["subreddit"]
+        sampled.append(subreddit)
+        return [{"source_post_id": posts[0]["id"], "score": 42, "body": f"{subreddit} comment sample"}]
+
+    async def fake_single(posts, comments, subreddit_name, game_name="", keywords=""):
+        analysed.append((subreddit_name, [comment["body"] for comment in comments]))
+        return _valid_analysis("Negative", posts)
+
+    monkeypatch.setattr(services_breakdown, "sample_comments_for_posts", fake_comments)
+    monkeypatch.setattr(services_breakdown, "analyze_subreddit_with_ai", fake_single)
+
+    result = _run_async(services_breakdown.analyze_subreddit_breakdown_with_ai(posts_by_subreddit, "Game"))
+
+    prompt = state["payloads"][0]["messages"][1]["content"]
+    assert "alpha comment sample" in prompt
+    assert "beta comment sample" in prompt
+    # The beta fallback reuses the comments sampled for the batched call.
+    assert sorted(sampled) == ["alpha", "beta"]
+    assert analysed == [("beta", ["beta comment sample"])]
+
+    # Batched rows are cached under the per-subreddit key, so the single path is served from cache.
+    row = _run_async(
+        services_breakdown._analyze_one_subreddit_breakdown_row(
+            "alpha",
+            posts_by_subreddit["alpha"],
+            game_name="Game",
+            keywords="",
+            semaphore=asyncio.Semaphore(1),
+        )
+    )
+    assert row == result["breakdown"][0]
+    assert sorted(sampled) == ["alpha", "beta"]
+    assert len(analysed) == 1
+
+
+def test_concurrent_comment_misses_share_one_request_and_release_their_locks(monkeypatch):
+    requested = []
+
+    async def handler(request):
+        requested.append(request.url.params["link_id"])
+        # Hold the response so every caller arrives while the first fill is still in flight.
+        await asyncio.sleep(0.01)
+        rows = [
+            {"id": f"c{i}", "body": f"comment {i}", "score": i, "created_utc": 1_700_000_000 + i, "author": f"u{i}"}
+            for i in range(5)
+        ]
+        return httpx.Response(200, content=orjson.dumps({"data": rows}))
+
+    _install_transport(monkeypatch, handler)
+
+    async def scenario():
+        return await asyncio.gather(*(services_fetch.fetch_comments_for_post("abc123", limit=3) for _ in range(5)))
+
+    results = _run_async(scenario())
+
+    assert requested == ["t3_abc123"]
+    assert len({tuple(comment["id"] for comment in result) for result in results}) == 1
+    assert len(results[0]) == 3
+    assert services_common._cache_fill_locks == {}
+
+
+def test_cache_fill_lock_serialises_only_callers_of_the_same_key():
+    order = []
+
+    async def fill(key, label):
+        async with services_common._cache_fill_lock("test", key):
+            order.append(f"{label}-start")
+            await asyncio.sleep(0.01)
+            order.append(f"{label}-end")
+
+    async def scenario():
+        await asyncio.gather(fill("a", "a1"), fill("a", "a2"), fill("b", "b1"))
+
+    _run_async(scenario())
+
+    assert order.index("a1-end") < order.index("a2-start")
+    assert order.index("b1-start") < order.index("a1-end")
+    assert services_common._cache_fill_locks == {}
+
+
+class _Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries_and_evicts_least_recently_used(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(services_common.time, "time", clock)
+    cache = services_common._TTLCache(maxsize=2, ttl=60)
+
+    cache["a"] = (clock.now, "A")
+    cache["b"] = (clock.now, "B")
+    assert cache.get("a") == (clock.now, "A")  # touching "a" makes "b" the eviction candidate
+
+    cache["c"] = (clock.now, "C")
+    assert list(cache) == ["a", "c"]
+    assert cache.get("b") is None
+
+    clock.now += 60
+    assert cache.get("a") is None
+    assert "a" not in cache
+
+    # Expired entries at the cold end are compacted on insert before any live one is evicted.
+    cache["d"] = (clock.now, "D")
+    assert list(cache) == ["d"]
+
+
+def test_ttl_cache_keeps_expired_entries_for_stale_reads_only(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(services_common.time, "time", clock)
+    cache = services_common._TTLCache(maxsize=4, ttl=60, stale_ttl=600)
+    cache["a"] = (clock.now, "A")
+
+    clock.now += 120
+    assert cache.get("a") is None
+    assert cache.get_stale("a") == (clock.now - 120, "A")
+
+    clock.now += 600
+    assert cache.get_stale("a") is None
+
+
+def test_failed_post_refill_serves_the_stale_entry(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(services_common.time, "time", clock)
+    state = {"fail": False}
+
+    def handler(request):
+        if state["fail"]:
+            return httpx.Response(503, content=b"down")
+        rows = [_raw_post(f"p{i}", "steady") for i in range(25)]
+        return httpx.Response(200, content=orjson.dumps({"data": rows}))
+
+    _install_transport(monkeypatch, handler)
+    fresh, fresh_is_stale = _run_async(services_fetch.fetch_reddit_posts_with_staleness("steady", limit=10))
+    assert not fresh_is_stale
+
+    clock.now += services_common.CACHE_TTL + 1
+    services_common._window_cache.clear()
+    state["fail"] = True
+
+    posts, is_stale = _run_async(services_fetch.fetch_reddit_posts_with_staleness("steady", limit=10))
+    assert posts == fresh
+    assert is_stale
+    assert _run_async(services_fetch.fetch_reddit_posts("steady", limit=10)) == fresh
+
+
+def test_failed_post_fetch_raises_when_nothing_is_cached(monkeypatch):
+    _install_transport(monkeypatch, lambda request: httpx.Response(503, content=b"down"))
+
+    with pytest.raises(RuntimeError):
+        _run_async(services_fetch.fetch_reddit_posts("empty", limit=10))
+
+
+def test_failed_comment_refill_serves_the_stale_entry(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(services_common.time, "time", clock)
+    services_common._comments_cache["abc123"] = (
+        clock.now,
+        [{"id": "c1", "body": "still here", "score": 4, "created_utc": 1_700_000_000, "author": "u1"}],
+    )
+    clock.now += services_common.CACHE_TTL + 1
+    _install_transport(monkeypatch, lambda request: httpx.Response(503, content=b"down"))
+
+    comments, is_stale = _run_async(services_fetch.fetch_comments_for_post_with_staleness("abc123"))
+
+    assert [comment["id"] for comment in comments] == ["c1"]
+    assert is_stale
+    assert _run_async(services_fetch.fetch_comments_for_post("abc123")) == comments
+
+
+def test_arctic_shift_get_caps_bodies_without_a_content_length(monkeypatch):
+    monkeypatch.setattr(services_fetch, "ARCTIC_SHIFT_MAX_RESPONSE_BYTES", 1_000)
+    streamed = []
+
+    async def body():
+        for _ in range(50):
+            streamed.append(1)
+            yield b"x" * 100
+
+    def handler(request):
+        return httpx.Response(200, content=body())
+
+    _install_transport(monkeypatch, handler)
+
+    with pytest.raises(RuntimeError, match="too large"):
+        _run_async(services_fetch._arctic_shift_get("/api/posts/search", {}))
+    # Reading stopped at the first chunk past the cap rather than buffering the whole body.
+    assert len(streamed) == 11
+
+
+def test_arctic_shift_get_caps_the_decoded_size_of_compressed_bodies(monkeypatch):
+    monkeypatch.setattr(services_fetch, "ARCTIC_SHIFT_MAX_RESPONSE_BYTES", 1_000)
+    compressed = gzip.compress(b"x" * 5_000)
+    assert len(compressed) < 1_000
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-encoding": "gzip"}, content=compressed)
+
+    _install_transport(monkeypatch, handler)
+
+    with pytest.raises(RuntimeError, match="too large"):
+        _run_async(services_fetch._arctic_shift_get("/api/posts/search", {}))
+
+
+def test_arctic_shift_get_returns_decoded_bodies_within_the_cap(monkeypatch):
+    payload = orjson.dumps({"data": [{"id": "abc"}]})
+
+    def handler(request):
+        return httpx.Response(
+            200,
+            headers={"content-encoding": "gzip", "content-type": "application/json"},
+            content=gzip.compress(payload),
+        )
+
+    _install_transport(monkeypatch, handler)
+
+    resp = _run_async(services_fetch._arctic_shift_get("/api/posts/search", {}))
+
+    assert resp.status_code == 200
+    assert resp.content == payload
+    assert resp.json() == {"data": [{"id": "abc"}]}
+
+
+@pytest.mark.parametrize(
+    "prefixes, expected",
+    [
+        ([], {}),
+        (["eldenring", "elden_ring", "elden", "ring", "er"], {"elden": 3, "ring": 1, "er": 1}),
+        # Prefixes shorter than four characters never stand in for longer ones.
+        (["arcraiders", "arc", "ar"], {"arcraiders": 1, "arc": 1, "ar": 1}),
+        # A prefix is only folded into the shortest kept prefix that covers it.
+        (["counterstrike", "counter_strike", "counter", "counters"], {"counter": 4}),
+        (["elden", "eldenring", "elden"], {"elden": 2}),
+        (["ring", "ring"], {"ring": 1}),
+        # Independent prefixes keep their input order.
+        (["zelda", "botw", "totk"], {"zelda": 1, "botw": 1, "totk": 1}),
+    ],
+)
+def test_collapse_subreddit_prefixes(prefixes, expected):
+    collapsed = services_common._collapse_subreddit_prefixes(prefixes)
+
+    assert collapsed == expected
+    assert list(collapsed) == list(expected)
+
+
+def test_overall_analysis_salvages_reply_truncated_at_max_tokens(monkeypatch):
+    posts = _subreddit_posts("alpha")
+    analysis = _valid_analysis("Mixed", posts)
+    analysis["sentiment_summary"] = "Players like the combat but the grind wears on them."
+    full_text = orjson.dumps(analysis).decode()
+    # Cut the reply mid-way through the last win, as a max_tokens stop would.
+    truncated_text = full_text[: full_text.rindex("win 2") + 3]
+    repairs = []
+
+    async def fake_chat(api_key, payload):
+        return truncated_text, "length"
+
+    async def fake_repair(raw_text, schema_hint):
+        repairs.append(schema_hint)
+        return None
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(services_analysis, "_openai_chat_completion_with_finish_reason", fake_chat)
+    monkeypatch.setattr(services_analysis, "_repair_json_payload_with_ai", fake_repair)
+
+    result = _run_async(services_analysis.analyze_posts_with_ai(posts, [], game_name="Test Game"))
+
+    assert repairs == []
+    assert services_analysis._extract_json_payload(truncated_text) is None
+    assert result["sentiment_label"] == "Mixed"
+    assert result["sentiment_summary"].startswith(analysis["sentiment_summary"])
+    assert [item["text"] for item in result["pain_points"]] == ["pain 0", "pain 1", "pain 2"]